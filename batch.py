@@ -0,0 +1,163 @@
+"""
+Headless batch prediction engine.
+
+Fits every dataset with every requested method and evaluates the fitted
+models at a list of query days, spreading the work over a process pool.
+
+Example:
+    python batch.py --defaults --csv Basil_02Jan-3Feb.csv --days 3 10.5 20 -o results.csv
+"""
+import argparse
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from datasets import DEFAULT_DATA, load_dataB, load_environment, read_measurements
+from models import METHODS, SelectedModel, environment_rows, fit_model
+from profiling import section
+
+def _predict_chunk(tasks):
+    """
+    Fit and evaluate a batch of datasets inside one worker.
+
+    Args:
+        tasks: List of (name, data, methods, days) tuples
+
+    Returns:
+        DataFrame with one row per dataset, method and query day
+    """
+    keys, heights, errors, selected, loo_rmse = [], [], [], [], []
+    for name, data, methods, days in tasks:
+        for method in methods:
+            error = ""
+            choice, score = "", np.nan
+            try:
+                with np.errstate(all='ignore'):
+                    model = fit_model(method, data[0], data[1], environment_rows(data))
+                    values = np.asarray(model(days), dtype=float)
+                if isinstance(model, SelectedModel):
+                    choice, score = model.method, model.loo_rmse
+            except Exception as e:
+                values = np.full(len(days), np.nan)
+                error = str(e)
+            keys.append((name, method, days))
+            heights.append(values)
+            errors.append(error)
+            selected.append(choice)
+            loo_rmse.append(score)
+
+    # Build a single frame per chunk; one frame per fit would dominate the run time
+    counts = [len(days) for _, _, days in keys]
+    with section("batch.build_frame", sum(counts)):
+        return pd.DataFrame({
+            "dataset": np.repeat([name for name, _, _ in keys], counts),
+            "method": np.repeat([method for _, method, _ in keys], counts),
+            "day": np.concatenate([days for _, _, days in keys]),
+            "height": np.concatenate(heights),
+            "error": np.repeat(errors, counts),
+            "selected_method": np.repeat(selected, counts),
+            "loo_rmse": np.repeat(loo_rmse, counts),
+        })
+
+def predict_many(datasets, days, methods=METHODS, workers=None, chunksize=None):
+    """
+    Predict heights for many datasets x methods x query days.
+
+    Args:
+        datasets: Mapping of dataset name to a 2 x n array of (time, height) rows,
+            optionally followed by sensor reading rows
+        days: Sequence of query days
+        methods: Methods to fit, a subset of METHODS
+        workers: Number of worker processes (None uses every core, 1 runs in-process)
+        chunksize: Datasets sent to a worker per task (None picks a balanced size)
+
+    Returns:
+        DataFrame with columns dataset, method, day, height, error and, for
+        the "Automático" method, selected_method and its loo_rmse
+    """
+    days = np.asarray(days, dtype=float)
+    tasks = [(name, np.asarray(data, dtype=float), list(methods), days)
+             for name, data in datasets.items()]
+    if not tasks:
+        return pd.DataFrame(columns=["dataset", "method", "day", "height", "error",
+                                     "selected_method", "loo_rmse"])
+
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        # A few chunks per worker keeps the pool balanced without
+        # paying inter-process overhead for every single dataset
+        chunksize = max(1, math.ceil(len(tasks) / (workers * 4)))
+    chunks = [tasks[i:i + chunksize] for i in range(0, len(tasks), chunksize)]
+
+    if workers == 1:
+        results = map(_predict_chunk, chunks)
+        return pd.concat(list(results), ignore_index=True)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_predict_chunk, chunks)
+        return pd.concat(list(results), ignore_index=True)
+
+def load_custom(path):
+    """Load a whitespace separated "tiempo altura" file as a 2 x n array, merging repeated times"""
+    return read_measurements(path, sort=True, duplicates='mean')
+
+def write_results(results, output):
+    """Write results to CSV, or to Parquet when output ends in .parquet"""
+    if output.endswith(".parquet"):
+        results.to_parquet(output, index=False)
+    else:
+        results.to_csv(output, index=False)
+
+def add_dataset_arguments(parser):
+    """Add the options that select input datasets (see load_datasets)"""
+    parser.add_argument("--defaults", action="store_true",
+                        help="incluir las plantas de ejemplo")
+    parser.add_argument("--csv", nargs="*", default=[],
+                        help="registros de sensores con el formato de Basil_02Jan-3Feb.csv")
+    parser.add_argument("--environment", action="store_true",
+                        help="cargar también las columnas de sensores de cada CSV (Regresión Ambiental)")
+    parser.add_argument("--store",
+                        help="carpeta de un PlantStore (store.py); se incluyen todas sus plantas")
+    parser.add_argument("--data", nargs="*", default=[],
+                        help="archivos personalizados con columnas 'tiempo altura'")
+    parser.add_argument("--start", type=int, default=0,
+                        help="primera fila leída de cada CSV")
+    parser.add_argument("--stop", type=int, default=None,
+                        help="fila final (exclusiva) leída de cada CSV")
+
+def load_datasets(args):
+    """Mapping of dataset name to data for the options of add_dataset_arguments"""
+    datasets = {}
+    if args.defaults or not (args.csv or args.data or args.store):
+        datasets.update(DEFAULT_DATA)
+    load = load_environment if args.environment else load_dataB
+    for path in args.csv:
+        datasets[os.path.splitext(os.path.basename(path))[0]] = load(path, args.start, args.stop)
+    if args.store:
+        from store import PlantStore
+        store = PlantStore(args.store)
+        datasets.update((plant, store.dataset(plant)) for plant in store.plants)
+    for path in args.data:
+        datasets[os.path.splitext(os.path.basename(path))[0]] = load_custom(path)
+    return datasets
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Predicción de crecimiento por lotes, sin interfaz gráfica")
+    add_dataset_arguments(parser)
+    parser.add_argument("--methods", nargs="*", default=METHODS, choices=METHODS)
+    parser.add_argument("--days", nargs="+", type=float, required=True,
+                        help="días en los que estimar la altura")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=None)
+    parser.add_argument("-o", "--output", default="predicciones.csv")
+    args = parser.parse_args(argv)
+
+    results = predict_many(load_datasets(args), args.days, args.methods, args.workers, args.chunksize)
+    write_results(results, args.output)
+    print(f"{len(results)} predicciones escritas en {args.output}")
+
+if __name__ == "__main__":
+    main()
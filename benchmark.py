@@ -0,0 +1,144 @@
+"""
+Benchmarks for interpolation.py against the SciPy routines.
+
+Sweeps the number of nodes, query points and series and, for every
+estimation method, records fit time, evaluation time, peak memory and the
+maximum deviation between the interpolation.py and SciPy results. Results
+are written as JSON so runs from different versions can be diffed.
+
+Example:
+    python benchmark.py -o bench.json
+    python benchmark.py -o new.json --compare bench.json
+"""
+import argparse
+import datetime
+import itertools
+import json
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+import scipy
+from scipy.interpolate import lagrange, interp1d
+from scipy.stats import linregress
+
+from interpolation import CubicSpline, LagrangeInterpolator, NewtonInterpolator, linear_regression
+
+def _scipy_linear(x, y):
+    slope, intercept, _, _, _ = linregress(x, y)
+    return lambda q: slope * q + intercept
+
+def _ours_linear(x, y):
+    _, predict = linear_regression(x, y)
+    return predict
+
+# method -> (interpolation.py fit, scipy fit); each fit returns a callable model.
+# Splines compare the natural spline with interp1d's not-a-knot spline, so part
+# of their deviation comes from the different boundary conditions.
+CASES = {
+    "lagrange": (LagrangeInterpolator, lagrange),
+    "newton": (NewtonInterpolator, lagrange),
+    "cubic_spline": (CubicSpline, lambda x, y: interp1d(x, y, kind='cubic', fill_value='extrapolate')),
+    "linear_regression": (_ours_linear, _scipy_linear),
+}
+
+def make_series(nodes, series, seed=0):
+    """Logistic growth curves with noise on a shared, jittered day grid"""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 30, nodes) + rng.uniform(-0.2, 0.2, nodes)
+    x.sort()
+    rate = rng.uniform(0.2, 0.5, (series, 1))
+    y = 60 / (1 + np.exp(-rate * (x - 15))) + rng.normal(0, 0.5, (series, nodes))
+    return x, y
+
+def _time_best(func, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def run_case(fit, x, y, queries, repeat):
+    """Fit every series, evaluate at queries, and return timings and values"""
+    fit_s, models = _time_best(lambda: [fit(x, row) for row in y], repeat)
+    eval_s, values = _time_best(lambda: np.array([model(queries) for model in models]), repeat)
+
+    tracemalloc.start()
+    np.array([model(queries) for model in [fit(x, row) for row in y]])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {"fit_s": fit_s, "eval_s": eval_s, "peak_bytes": peak}, values
+
+def run(nodes_list, queries_list, series_list, methods, repeat, seed=0):
+    results = []
+    for nodes, queries, series in itertools.product(nodes_list, queries_list, series_list):
+        x, y = make_series(nodes, series, seed)
+        q = np.linspace(x[0], x[-1], queries)
+        for method in methods:
+            ours, theirs = CASES[method]
+            ours_stats, ours_values = run_case(ours, x, y, q, repeat)
+            scipy_stats, scipy_values = run_case(theirs, x, y, q, repeat)
+            deviation = float(np.max(np.abs(ours_values - scipy_values)))
+            for impl, stats in (("interpolation", ours_stats), ("scipy", scipy_stats)):
+                results.append({"method": method, "impl": impl, "nodes": nodes,
+                                "queries": queries, "series": series,
+                                "max_abs_deviation": deviation, **stats})
+            print(f"{method:18} n={nodes:<4} q={queries:<5} s={series:<4} "
+                  f"fit {ours_stats['fit_s']:.2e}/{scipy_stats['fit_s']:.2e}s  "
+                  f"eval {ours_stats['eval_s']:.2e}/{scipy_stats['eval_s']:.2e}s  "
+                  f"dev {deviation:.2e}")
+    return results
+
+def compare(results, baseline):
+    """Print time ratios of results against a previous run (>1 means slower now)"""
+    def key(r):
+        return (r["method"], r["impl"], r["nodes"], r["queries"], r["series"])
+
+    previous = {key(r): r for r in baseline["results"]}
+    for r in results:
+        old = previous.get(key(r))
+        if old is None:
+            continue
+        print(f"{r['method']:18} {r['impl']:13} n={r['nodes']:<4} q={r['queries']:<5} s={r['series']:<4} "
+              f"fit x{r['fit_s'] / old['fit_s']:.2f}  eval x{r['eval_s'] / old['eval_s']:.2f}  "
+              f"mem x{r['peak_bytes'] / max(old['peak_bytes'], 1):.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark interpolation.py against SciPy")
+    parser.add_argument("--nodes", nargs="+", type=int, default=[5, 10, 20, 40])
+    parser.add_argument("--queries", nargs="+", type=int, default=[10, 200, 2000])
+    parser.add_argument("--series", nargs="+", type=int, default=[1, 10, 100])
+    parser.add_argument("--methods", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="benchmark.json")
+    parser.add_argument("--compare", help="previous JSON results to diff against")
+    args = parser.parse_args(argv)
+
+    results = run(args.nodes, args.queries, args.series, args.methods, args.repeat, args.seed)
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "scipy": scipy.__version__,
+            "machine": platform.platform(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados escritos en {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
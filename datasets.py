@@ -1,21 +1,312 @@
-import pandas as pd
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
 import numpy as np
 
-def load_dataB(csv_path):
+from profiling import instrument
+
+DATE_FORMAT = '%d/%m/%Y'  # DD/MM/YYYY, as written by the greenhouse loggers
+CACHE_VERSION = 1
+
+# Datos de ejemplo (tiempo en días, altura en cm)
+DEFAULT_DATA = {
+    "Basil": np.array([[0,1,4,5,6,7,8,9,11,12],
+                       [7.22,7.5,8,12,15,18,24,37,42,54]]), #https://data.mendeley.com/datasets/vx4jy7wyvd/1/files/05bbf7c4-7bb6-445e-977e-fea44c9ab7b7
+    "Espinaca": np.array([[0,3,6,9,12,15,18,21], 
+                          [1.50,3.20,4.65,6.10,8.00,9.30,11.40,13.50]]),#Rubatzky, V. E., & Yamaguchi, M. (1997). World Vegetables: Principles, Production, and Nutritive Values. Springer.
+    "Semilla de maiz": np.array([[0, 3, 6, 9, 12, 15, 18, 21, 24], 
+                                 [0, 1, 1, 1.4, 2.75, 5.5, 7.2, 9.5, 10]])#https://es.slideshare.net/slideshow/informe-experimento-plantas-1/10832712?utm_source=chatgpt.com
+}
+
+# Sensor columns of the greenhouse loggers used by the environmental model
+ENV_COLUMNS = ['Temp', 'Humidity', 'Max Potential Solar Radiation (W/m²)', 'pH', 'TDS', 'Green Area']
+
+# Plantas con registro de sensores (nombre -> CSV)
+ENVIRONMENT_DATASETS = {
+    "Basil (sensores)": "Basil_02Jan-3Feb.csv",
+}
+
+def iter_dataB(csv_path, start=0, stop=None, chunksize=100_000, columns=(), origin=None):
+    """
+    Stream (days, height) measurements from a sensor log in chunks.
+
+    Only the Date and Height columns are parsed, so memory use is bounded by
+    chunksize regardless of the file size. Days are counted from origin or,
+    by default, from the first measurement in the file, even when the window
+    starts later.
+
+    Args:
+        csv_path: Path to a CSV with the Basil_02Jan-3Feb.csv schema
+        start: Index of the first data row to read
+        stop: Index one past the last data row to read (None reads to the end)
+        chunksize: Number of rows parsed per chunk
+        columns: Extra numeric columns (e.g. 'Temp', 'pH') appended as rows
+        origin: Date counted as day 0 (anything pandas.Timestamp accepts)
+
+    Yields:
+        (2 + len(columns)) x k arrays of (days, height, *columns) rows, in file order
+    """
+    import pandas as pd  # deferred: only needed when a CSV is actually parsed
+
+    header = pd.read_csv(csv_path, nrows=0).columns
+    if origin is None:
+        first = pd.read_csv(csv_path, usecols=['Date'], dtype={'Date': str}, nrows=1)
+        origin = pd.to_datetime(first['Date'], format=DATE_FORMAT).iloc[0]
+    else:
+        origin = pd.Timestamp(origin)
+
+    reader = pd.read_csv(csv_path, header=None, names=list(header), skiprows=start + 1,
+                         nrows=None if stop is None else max(stop - start, 0),
+                         usecols=['Date', 'Height', *columns],
+                         dtype={'Date': str, 'Height': float, **{c: float for c in columns}},
+                         chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            dates = pd.to_datetime(chunk['Date'], format=DATE_FORMAT)
+            days = (dates - origin).dt.days.to_numpy(dtype=float)
+            yield np.array([days, *(chunk[c].to_numpy(dtype=float) for c in ['Height', *columns])])
+
+def _parse_measurements(buffer, sort, duplicates):
+    import pandas as pd  # deferred: only needed when custom data is imported
+
+    if duplicates not in ('raise', 'mean'):
+        raise ValueError("duplicates must be 'raise' or 'mean'")
+    try:
+        # sep=r'\s+' runs on pandas' C parser, with no per-line Python work
+        # index_col=False keeps an extra leading field from becoming the index
+        frame = pd.read_csv(buffer, sep=r'\s+', header=None, index_col=False,
+                            comment='#', skip_blank_lines=True)
+    except pd.errors.EmptyDataError:
+        raise ValueError("Se requieren al menos 2 puntos de datos")
+    except pd.errors.ParserError as e:
+        raise ValueError(f"Cada línea debe contener exactamente 2 números (tiempo y altura): {str(e).strip()}")
+
+    if frame.shape[1] != 2:
+        # The column count comes from the first row; longer later rows fail to parse
+        raise ValueError("Fila 1: Cada línea debe contener exactamente 2 números (tiempo y altura)")
+
+    values = frame.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    bad = np.flatnonzero(~np.isfinite(values).all(axis=1))
+    if len(bad):
+        raise ValueError(f"Fila {bad[0] + 1}: Datos inválidos - se esperaban 2 números (tiempo y altura)")
+    if len(values) < 2:
+        raise ValueError("Se requieren al menos 2 puntos de datos")
+
+    t, h = values.T
+    bad = np.flatnonzero((t < 0) | (h < 0))
+    if len(bad):
+        raise ValueError(f"Fila {bad[0] + 1}: Los valores no pueden ser negativos")
+
+    if duplicates == 'mean':
+        # Repeated times become one point at the mean of their heights (sorted by time)
+        times, inverse, counts = np.unique(t, return_inverse=True, return_counts=True)
+        if len(times) < 2:
+            raise ValueError("Se requieren al menos 2 puntos de datos")
+        return np.array([times, np.bincount(inverse, weights=h) / counts])
+
+    order = np.argsort(t, kind='stable')
+    if np.any(np.diff(t[order]) == 0):
+        raise ValueError("Los valores de tiempo deben ser únicos")
+    return values[order].T if sort else values.T
+
+def parse_measurements(text, sort=False, duplicates='raise'):
+    """
+    Parse "tiempo altura" rows, one pair per line, in one vectorized pass.
+
+    Blank lines and text after '#' are ignored. Negative values and, unless
+    merged, repeated times are rejected with a ValueError naming the first
+    offending data row.
+
+    Args:
+        text: Whitespace separated pairs, e.g. pasted from a spreadsheet
+        sort: Return the points sorted by time
+        duplicates: 'raise' to reject repeated times, or 'mean' to merge them
+            into one point at their mean height (the result is then sorted)
+
+    Returns:
+        2 x n array of (time, height) rows
+    """
+    import io
+    return _parse_measurements(io.StringIO(text), sort, duplicates)
+
+def read_measurements(path, sort=False, duplicates='raise'):
+    """Like parse_measurements, reading the pairs from a file"""
+    return _parse_measurements(path, sort, duplicates)
+
+def _cache_dir(csv_path):
+    folder, name = os.path.split(os.path.abspath(csv_path))
+    return os.path.join(folder, f".{name}.cache")
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _open_cache(csv_path, columns):
+    """Return (meta, memory-mapped array) for a valid cache, or None"""
+    cache_dir = _cache_dir(csv_path)
+    meta_path = os.path.join(cache_dir, 'meta.json')
     try:
-        df = pd.read_csv(csv_path)
-        
-        # Convert dates to datetime and calculate days since first measurement
-        df['Date'] = pd.to_datetime(df['Date'], dayfirst=True)  # Handle DD/MM/YYYY format
-        df['Days'] = (df['Date'] - df['Date'].iloc[0]).dt.days
-        
-        # Ensure numeric values, sort by days, and take first 20 rows
-        df = df.sort_values('Days').head(19)
-        days = df['Days'].values.astype(float)
-        height = df['Height'].values.astype(float)
-        
-        return np.array([days, height])
-    
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    stat = os.stat(csv_path)
+    if meta.get('version') != CACHE_VERSION or meta.get('size') != stat.st_size:
+        return None
+    if not set(columns) <= set(meta['columns']):
+        return None
+    if meta.get('mtime_ns') != stat.st_mtime_ns:
+        # Touched or copied but possibly unchanged: fall back to the content hash
+        if meta.get('sha256') != _file_hash(csv_path):
+            return None
+        meta['mtime_ns'] = stat.st_mtime_ns
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+
+    return meta, np.load(os.path.join(cache_dir, 'data.npy'), mmap_mode='r')
+
+@instrument()
+def build_cache(csv_path, columns=(), chunksize=100_000):
+    """
+    Parse a sensor log once and store it as a binary columnar cache.
+
+    The cache lives in a hidden folder next to the CSV and holds a single
+    (2 + len(columns)) x n float64 .npy file, one row per column, plus a
+    meta.json with the source size, mtime and SHA-256 used for invalidation.
+    Rows are streamed to disk chunk by chunk, so memory stays bounded.
+
+    Args:
+        csv_path: Path to a CSV with the Basil_02Jan-3Feb.csv schema
+        columns: Extra numeric columns to store after Days and Height
+        chunksize: Number of rows parsed per chunk
+    """
+    names = ['Days', 'Height', *columns]
+    cache_dir = _cache_dir(csv_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    stat = os.stat(csv_path)
+
+    with tempfile.TemporaryDirectory(dir=cache_dir) as tmp:
+        parts = [open(os.path.join(tmp, f"{i}.f8"), 'wb') for i in range(len(names))]
+        n = 0
+        try:
+            for chunk in iter_dataB(csv_path, chunksize=chunksize, columns=columns):
+                for part, row in zip(parts, chunk):
+                    row.astype('<f8').tofile(part)
+                n += chunk.shape[1]
+        finally:
+            for part in parts:
+                part.close()
+
+        # Rows are contiguous in a C-ordered (columns x n) array, so the .npy
+        # body is just the per-column files concatenated after the header
+        data_tmp = os.path.join(tmp, 'data.npy')
+        with open(data_tmp, 'wb') as out:
+            np.lib.format.write_array_header_1_0(
+                out, {'descr': '<f8', 'fortran_order': False, 'shape': (len(names), n)})
+            for i in range(len(names)):
+                with open(os.path.join(tmp, f"{i}.f8"), 'rb') as part:
+                    shutil.copyfileobj(part, out)
+        os.replace(data_tmp, os.path.join(cache_dir, 'data.npy'))
+
+    meta = {'version': CACHE_VERSION, 'columns': names, 'rows': n,
+            'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': _file_hash(csv_path)}
+    with open(os.path.join(cache_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+@instrument()
+def load_columns(csv_path, columns=(), chunksize=100_000):
+    """
+    Load Days, Height and extra columns through the binary cache.
+
+    The cache is (re)built when it is missing, stale or lacks a requested
+    column; otherwise the arrays are memory-mapped views with no parsing.
+
+    Args:
+        csv_path: Path to a CSV with the Basil_02Jan-3Feb.csv schema
+        columns: Extra numeric columns to load
+        chunksize: Number of rows parsed per chunk when (re)building
+
+    Returns:
+        Tuple of (column names, memory-mapped array with one row per column)
+    """
+    cached = _open_cache(csv_path, columns)
+    if cached is None:
+        previous = _open_cache(csv_path, ())
+        if previous is not None:
+            # Keep columns cached by earlier calls alongside the new ones
+            columns = [*previous[0]['columns'][2:], *(c for c in columns if c not in previous[0]['columns'])]
+        build_cache(csv_path, columns, chunksize)
+        cached = _open_cache(csv_path, columns)
+    meta, data = cached
+    return meta['columns'], data
+
+@instrument()
+def load_dataB(csv_path, start=0, stop=19, chunksize=100_000, cache=True):
+    """
+    Load a window of (days, height) measurements from a sensor log.
+
+    Args:
+        csv_path: Path to a CSV with the Basil_02Jan-3Feb.csv schema
+        start: Index of the first data row to read
+        stop: Index one past the last data row to read (None reads to the end)
+        chunksize: Number of rows parsed per chunk
+        cache: Read through the binary cache next to the CSV (see build_cache)
+
+    Returns:
+        2 x n array of (days, height) rows sorted by days
+    """
+    try:
+        data = None
+        if cache:
+            try:
+                # Days and Height are the first two rows: a zero-copy view
+                data = load_columns(csv_path, chunksize=chunksize)[1][:2, start:stop]
+            except OSError as e:
+                print(f"Cache unavailable for {csv_path}: {str(e)}")
+        if data is None:
+            data = np.concatenate(list(iter_dataB(csv_path, start, stop, chunksize)), axis=1)
+
+        # Sort the window by days
+        if np.all(np.diff(data[0]) >= 0):
+            return data
+        return data[:, np.argsort(data[0], kind='stable')]
+
     except Exception as e:
         print(f"Error loading {csv_path}: {str(e)}")
-        return np.array([[0], [0]])  # Return dummy data if error occurs
\ No newline at end of file
+        return np.array([[0], [0]])  # Return dummy data if error occurs
+
+@instrument()
+def load_environment(csv_path, start=0, stop=None, columns=ENV_COLUMNS, chunksize=100_000):
+    """
+    Load measurements together with the sensor readings taken with them.
+
+    Unlike load_dataB, errors are raised rather than replaced by dummy data,
+    since a dummy series has no environment to fit.
+
+    Args:
+        csv_path: Path to a CSV with the Basil_02Jan-3Feb.csv schema
+        start: Index of the first data row to read
+        stop: Index one past the last data row to read (None reads to the end)
+        columns: Sensor columns to load
+        chunksize: Number of rows parsed per chunk when (re)building the cache
+
+    Returns:
+        (2 + len(columns)) x n array of (days, height, *columns) rows sorted by days
+    """
+    try:
+        names, data = load_columns(csv_path, columns, chunksize)
+        rows = [0, 1, *(names.index(c) for c in columns)]
+        data = data[rows, start:stop]
+    except OSError as e:
+        print(f"Cache unavailable for {csv_path}: {str(e)}")
+        data = np.concatenate(list(iter_dataB(csv_path, start, stop, chunksize, columns=columns)), axis=1)
+    if np.all(np.diff(data[0]) >= 0):
+        return data
+    return data[:, np.argsort(data[0], kind='stable')]
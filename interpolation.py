@@ -1,4 +1,226 @@
+import numpy as np
+
+from profiling import instrument
+
+WEIGHT_BLOCK = 1 << 16  # pairwise differences held at once when computing barycentric weights
+
+class LagrangeInterpolator:
+    """
+    Lagrange interpolating polynomial in barycentric form.
+
+    The barycentric weights are computed once when the interpolator is
+    built; every evaluation afterwards is a single vectorized O(n*m) pass
+    over the m query points.
+
+    Args:
+        x_points: List of x-coordinates of known points (must be distinct)
+        y_points: List of y-coordinates of known points
+    """
+
+    @instrument("LagrangeInterpolator.fit")
+    def __init__(self, x_points, y_points):
+        self.x_points = np.asarray(x_points, dtype=float)
+        self.y_points = np.asarray(y_points, dtype=float)
+
+        # Work with logarithms so long series do not overflow; the weights
+        # only matter up to a common factor, which cancels on evaluation.
+        # Rows are taken in blocks so memory stays O(n) for long series.
+        n = len(self.x_points)
+        log_w = np.empty(n)
+        sign = np.empty(n)
+        block = max(1, WEIGHT_BLOCK // max(n, 1))
+        for start in range(0, n, block):
+            rows = np.arange(start, min(start + block, n))
+            diff = self.x_points[rows, None] - self.x_points[None, :]
+            diff[np.arange(len(rows)), rows] = 1.0
+            log_w[rows] = -np.log(np.abs(diff)).sum(axis=1)
+            sign[rows] = np.prod(np.sign(diff), axis=1)
+        self.weights = sign * np.exp(log_w - log_w.max())
+
+    @instrument("LagrangeInterpolator.eval")
+    def __call__(self, x):
+        """
+        Evaluate the polynomial at x.
+
+        Args:
+            x: Point or array of points at which to estimate y
+
+        Returns:
+            Estimated y value(s) at point(s) x, with the same shape as x
+        """
+        x = np.asarray(x, dtype=float)
+        flat = x.reshape(-1)
+        diff = flat[:, None] - self.x_points[None, :]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            terms = self.weights / diff
+            result = (terms @ self.y_points) / terms.sum(axis=1)
+
+        # Queries that land exactly on a node take the node value directly
+        rows, cols = np.nonzero(diff == 0)
+        result[rows] = self.y_points[cols]
+
+        return result.reshape(x.shape) if x.ndim else result[0]
+
+class NewtonInterpolator:
+    """
+    Newton interpolating polynomial built from divided differences.
+
+    The coefficient vector is computed once when the interpolator is built;
+    every evaluation afterwards uses Horner's scheme over the whole array of
+    query points at once. New measurements can be added with append(), which
+    extends the divided-difference table in O(n) by keeping only its last
+    diagonal instead of the full table.
+
+    Args:
+        x_points: List of x-coordinates of known points (must be distinct)
+        y_points: List of y-coordinates of known points
+    """
+
+    @instrument("NewtonInterpolator.fit")
+    def __init__(self, x_points=(), y_points=()):
+        x = np.array(x_points, dtype=float)
+        coefficients = np.array(y_points, dtype=float)
+        n = len(x)
+
+        # Last diagonal of the table: f[x_(n-1-j), ..., x_(n-1)] for j = 0..n-1
+        diagonal = [coefficients[-1]] if n else []
+        for j in range(1, n):
+            coefficients[j:] = (coefficients[j:] - coefficients[j-1:-1]) / (x[j:] - x[:-j])
+            diagonal.append(coefficients[-1])
+
+        self._x = x
+        self._coefficients = coefficients
+        self._diagonal = [float(d) for d in diagonal]
+        self._size = n
+
+    @property
+    def x_points(self):
+        return self._x[:self._size]
+
+    @property
+    def coefficients(self):
+        return self._coefficients[:self._size]
+
+    def __len__(self):
+        return self._size
+
+    @instrument()
+    def append(self, t, h):
+        """
+        Add one measurement and extend the divided-difference table in O(n).
+
+        Args:
+            t: x-coordinate of the new point (must differ from existing ones)
+            h: y-coordinate of the new point
+        """
+        t = float(t)
+        n = self._size
+        if np.any(self.x_points == t):
+            raise ValueError(f"x = {t} is already an interpolation node")
+
+        if n == len(self._x):
+            # Grow geometrically so a season of appends stays amortized O(1) in copying
+            capacity = max(8, 2 * n)
+            self._x = np.resize(self._x, capacity)
+            self._coefficients = np.resize(self._coefficients, capacity)
+
+        # Walk the last diagonal: f[x_(n-j), ..., t] from f[x_(n-j), ..., x_(n-1)]
+        nodes = self._x[n-1::-1].tolist() if n else []
+        value = float(h)
+        for j in range(n):
+            next_value = (value - self._diagonal[j]) / (t - nodes[j])
+            self._diagonal[j] = value
+            value = next_value
+        self._diagonal.append(value)
+
+        self._x[n] = t
+        self._coefficients[n] = value
+        self._size = n + 1
+
+    @instrument("NewtonInterpolator.eval")
+    def __call__(self, x):
+        """
+        Evaluate the polynomial at x.
+
+        Args:
+            x: Point or array of points at which to estimate y
+
+        Returns:
+            Estimated y value(s) at point(s) x, with the same shape as x
+        """
+        x = np.asarray(x, dtype=float)
+        result = np.full(x.shape, self.coefficients[-1])
+
+        for k in range(len(self.coefficients) - 2, -1, -1):
+            result = result * (x - self.x_points[k]) + self.coefficients[k]
+
+        return result if x.ndim else result[()]
+
+class LocalPolynomialInterpolator:
+    """
+    Piecewise interpolation with low-degree Newton polynomials.
+
+    Instead of one global polynomial of degree n-1, each interval between
+    consecutive nodes is evaluated with the degree-k Newton polynomial
+    through the k+1 neighbouring nodes most centred on it. The divided
+    differences of all n-k windows are computed together in k vectorized
+    column steps (O(n*k)), and a query costs one binary search over the
+    breakpoints plus a degree-k Horner evaluation (O(log n + k)).
+
+    Args:
+        x_points: List of x-coordinates of known points (distinct, in any order)
+        y_points: List of y-coordinates of known points
+        degree: Degree k of each local polynomial (reduced when there are fewer points)
+    """
+
+    @instrument("LocalPolynomialInterpolator.fit")
+    def __init__(self, x_points, y_points, degree=3):
+        x = np.asarray(x_points, dtype=float)
+        # Windows and breakpoints are taken over the nodes sorted by x
+        order = np.argsort(x, kind='stable')
+        self.x_points = x[order]
+        y = np.asarray(y_points, dtype=float)[order]
+        n = len(self.x_points)
+        if n < 2:
+            raise ValueError("At least two points are required")
+        self.degree = k = min(degree, n - 1)
+
+        # One row per window of k+1 consecutive nodes
+        self.nodes = np.lib.stride_tricks.sliding_window_view(self.x_points, k + 1)
+        coefficients = np.lib.stride_tricks.sliding_window_view(y, k + 1).copy()
+        for j in range(1, k + 1):
+            coefficients[:, j:] = ((coefficients[:, j:] - coefficients[:, j-1:-1])
+                                   / (self.nodes[:, j:] - self.nodes[:, :-j]))
+        self.coefficients = coefficients
+
+        # Interval i uses the window starting (k-1)//2 nodes to its left, shifted at the ends
+        self.window_start = np.clip(np.arange(n - 1) - (k - 1) // 2, 0, n - k - 1)
+
+    @instrument("LocalPolynomialInterpolator.eval")
+    def __call__(self, x):
+        """
+        Evaluate the piecewise polynomial at x.
+
+        Args:
+            x: Point or array of points at which to estimate y
 
+        Returns:
+            Estimated y value(s) at point(s) x, with the same shape as x
+        """
+        x = np.asarray(x, dtype=float)
+        i = np.clip(np.searchsorted(self.x_points, x) - 1, 0, len(self.x_points) - 2)
+        window = self.window_start[i]
+        nodes = self.nodes[window]
+        coefficients = self.coefficients[window]
+
+        result = coefficients[..., self.degree]
+        for j in range(self.degree - 1, -1, -1):
+            result = result * (x - nodes[..., j]) + coefficients[..., j]
+
+        return result if x.ndim else result[()]
+
+@instrument()
 def lagrange_interpolation(x_points, y_points, x):
     """
     Perform Lagrange interpolation to estimate y at point x.
@@ -6,23 +228,14 @@ def lagrange_interpolation(x_points, y_points, x):
     Args:
         x_points: List of x-coordinates of known points
         y_points: List of y-coordinates of known points
-        x: Point at which to estimate y
+        x: Point or array of points at which to estimate y
         
     Returns:
-        Estimated y value at point x
+        Estimated y value(s) at point(s) x
     """
-    n = len(x_points)
-    result = 0.0
-    
-    for i in range(n):
-        term = y_points[i]
-        for j in range(n):
-            if j != i:
-                term *= (x - x_points[j]) / (x_points[i] - x_points[j])
-        result += term
-    
-    return result
+    return LagrangeInterpolator(x_points, y_points)(x)
 
+@instrument()
 def newton_interpolation(x_points, y_points, x):
     """
     Perform Newton interpolation using divided differences.
@@ -30,34 +243,166 @@ def newton_interpolation(x_points, y_points, x):
     Args:
         x_points: List of x-coordinates of known points
         y_points: List of y-coordinates of known points
-        x: Point at which to estimate y
+        x: Point or array of points at which to estimate y
         
     Returns:
-        Estimated y value at point x
+        Estimated y value(s) at point(s) x
     """
-    n = len(x_points)
-    # Create divided differences table
-    fdd = [[0] * n for _ in range(n)]
-    
-    for i in range(n):
-        fdd[i][0] = y_points[i]
-    
-    for j in range(1, n):
-        for i in range(n - j):
-            fdd[i][j] = (fdd[i+1][j-1] - fdd[i][j-1]) / (x_points[i+j] - x_points[i])
-    
-    # Evaluate the interpolation polynomial at x
-    result = fdd[0][0]
-    x_term = 1.0
-    
+    return NewtonInterpolator(x_points, y_points)(x)
+
+@instrument()
+def _solve_tridiagonal(lower, diag, upper, rhs):
+    """
+    Solve tridiagonal systems with the Thomas algorithm in O(n).
+
+    All arguments are arrays whose last axis runs along the system; leading
+    axes are broadcast, so many right-hand sides (or many systems) are solved
+    in the same pass. A matrix shared by all series is eliminated only once.
+
+    Args:
+        lower: Sub-diagonal, lower[..., i] multiplies unknown i-1 in row i (lower[..., 0] unused)
+        diag: Main diagonal
+        upper: Super-diagonal, upper[..., i] multiplies unknown i+1 in row i (upper[..., -1] unused)
+        rhs: Right-hand side
+
+    Returns:
+        Solution array with the broadcast shape of the arguments
+    """
+    lower, diag, upper = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (lower, diag, upper)))
+    rhs = np.asarray(rhs, dtype=float)
+    # Give the matrix as many leading axes as rhs without copying it, so a
+    # shared matrix keeps its own (smaller) elimination coefficients
+    extra = (1,) * max(rhs.ndim - diag.ndim, 0)
+    lower, diag, upper = (a.reshape(extra + a.shape) for a in (lower, diag, upper))
+
+    # Iterate over the first axis, which is cheaper to index than the last
+    lower, diag, upper, rhs = (np.moveaxis(a, -1, 0) for a in (lower, diag, upper, rhs))
+    n = len(diag)
+    c = np.zeros(np.broadcast_shapes(lower.shape, diag.shape, upper.shape))
+    d = np.zeros(np.broadcast_shapes(c.shape, rhs.shape))
+    c[0] = upper[0] / diag[0]
+    d[0] = rhs[0] / diag[0]
+
     for i in range(1, n):
-        x_term *= (x - x_points[i-1])
-        result += fdd[0][i] * x_term
-    
-    return result
+        denom = diag[i] - lower[i] * c[i-1]
+        c[i] = upper[i] / denom
+        d[i] = (rhs[i] - lower[i] * d[i-1]) / denom
 
-import numpy as np
+    for i in range(n - 2, -1, -1):
+        d[i] -= c[i] * d[i+1]
+
+    return np.moveaxis(d, 0, -1)
+
+def _natural_spline_coefficients(x, y, lengths=None):
+    """
+    Segment coefficients (a, b, c, d) of natural cubic splines.
+
+    Works along the last axis, so x and y may be single series, a shared
+    grid with many series of y, or one compacted grid per series.
+
+    Args:
+        x: Nodes, shape (..., n), strictly increasing over the valid part
+        y: Values, shape (..., n)
+        lengths: Number of valid leading nodes per series, for padded input
+
+    Returns:
+        Tuple of coefficient arrays, each of shape (..., n-1)
+    """
+    n = x.shape[-1]
+    with np.errstate(invalid='ignore'):
+        h = np.diff(x, axis=-1)
+        if lengths is not None:
+            # Padded segments get a dummy width and zero slope
+            padded = np.arange(n - 1) >= (lengths[:, None] - 1)
+            h = np.where(padded, 1.0, h)
+        slopes = np.diff(y, axis=-1) / h
+        if lengths is not None:
+            slopes = np.where(padded, 0.0, slopes)
+
+    # Natural boundary: the first and last rows of the system are identity
+    shape = h.shape[:-1] + (n,)
+    lower = np.zeros(shape)
+    diag = np.ones(shape)
+    upper = np.zeros(shape)
+    rhs = np.zeros(slopes.shape[:-1] + (n,))
+    lower[..., 1:-1] = h[..., :-1]
+    diag[..., 1:-1] = 2 * (h[..., :-1] + h[..., 1:])
+    upper[..., 1:-1] = h[..., 1:]
+    rhs[..., 1:-1] = 3 * (slopes[..., 1:] - slopes[..., :-1])
+    if lengths is not None:
+        # Rows from each series' last node onwards are identity as well
+        boundary = np.arange(n) >= (lengths[:, None] - 1)
+        lower[boundary] = 0
+        diag[boundary] = 1
+        upper[boundary] = 0
+        rhs[boundary] = 0
+
+    c = _solve_tridiagonal(lower, diag, upper, rhs)
+
+    b = slopes - h * (2 * c[..., :-1] + c[..., 1:]) / 3
+    d = (c[..., 1:] - c[..., :-1]) / (3 * h)
+    return y[..., :-1], b, c[..., :-1], d
+
+class CubicSpline:
+    """
+    Natural cubic spline with per-segment polynomial coefficients.
+
+    The tridiagonal system is solved once in O(n) when the spline is built.
+    Segment i covers [x_points[i], x_points[i+1]] and is evaluated as
+    a[i] + b[i]*dx + c[i]*dx**2 + d[i]*dx**3 with dx = x - x_points[i].
+
+    Args:
+        x_points: List of x-coordinates of known points (must be strictly increasing)
+        y_points: List of y-coordinates of known points
+    """
+
+    @instrument("CubicSpline.fit")
+    def __init__(self, x_points, y_points):
+        self.x_points = np.asarray(x_points, dtype=float)
+        y = np.asarray(y_points, dtype=float)
+        self.a, self.b, self.c, self.d = _natural_spline_coefficients(self.x_points, y)
+
+    def _segments(self, x):
+        i = np.searchsorted(self.x_points, x) - 1
+        i = np.clip(i, 0, len(self.x_points) - 2)
+        return i, x - self.x_points[i]
+
+    @instrument("CubicSpline.eval")
+    def __call__(self, x):
+        """
+        Evaluate the spline at x.
+
+        Args:
+            x: Point or array of points at which to estimate y
+
+        Returns:
+            Estimated y value(s) at point(s) x, with the same shape as x
+        """
+        x = np.asarray(x, dtype=float)
+        i, dx = self._segments(x)
+        return ((self.d[i] * dx + self.c[i]) * dx + self.b[i]) * dx + self.a[i]
+
+    @instrument()
+    def derivative(self, x, order=1):
+        """
+        Evaluate a derivative of the spline at x (the growth rate for order 1).
+
+        Args:
+            x: Point or array of points at which to evaluate
+            order: Derivative order, 1 or 2
+
+        Returns:
+            Derivative value(s) at point(s) x, with the same shape as x
+        """
+        x = np.asarray(x, dtype=float)
+        i, dx = self._segments(x)
+        if order == 1:
+            return (3 * self.d[i] * dx + 2 * self.c[i]) * dx + self.b[i]
+        if order == 2:
+            return 6 * self.d[i] * dx + 2 * self.c[i]
+        raise ValueError("order must be 1 or 2")
 
+@instrument()
 def cubic_spline(x_points, y_points, x):
     """
     Perform cubic spline interpolation (natural spline).
@@ -70,50 +415,270 @@ def cubic_spline(x_points, y_points, x):
     Returns:
         Estimated y value(s) at point(s) x
     """
-    n = len(x_points)
-    h = np.diff(x_points)
-    
-    # Build tridiagonal system for second derivatives
-    A = np.zeros((n, n))
-    A[0, 0] = 1
-    A[-1, -1] = 1
-    
-    for i in range(1, n-1):
-        A[i, i-1] = h[i-1]
-        A[i, i] = 2 * (h[i-1] + h[i])
-        A[i, i+1] = h[i]
-    
-    # Build right-hand side
-    b = np.zeros(n)
-    for i in range(1, n-1):
-        b[i] = 3 * ((y_points[i+1] - y_points[i]) / h[i] - (y_points[i] - y_points[i-1]) / h[i-1])
-    
-    # Solve for second derivatives
-    c_prime = np.linalg.solve(A, b)
-    
-    # Find which interval each x is in
-    if isinstance(x, (list, np.ndarray)):
-        results = []
-        for x_val in x:
-            i = np.searchsorted(x_points, x_val) - 1
-            i = max(min(i, n-2), 0)
-            dx = x_val - x_points[i]
-            a = y_points[i]
-            b = (y_points[i+1] - y_points[i]) / h[i] - h[i] * (2 * c_prime[i] + c_prime[i+1]) / 3
-            c = c_prime[i]
-            d = (c_prime[i+1] - c_prime[i]) / (3 * h[i])
-            results.append(a + b * dx + c * dx**2 + d * dx**3)
-        return np.array(results)
-    else:
-        i = np.searchsorted(x_points, x) - 1
-        i = max(min(i, n-2), 0)
-        dx = x - x_points[i]
-        a = y_points[i]
-        b = (y_points[i+1] - y_points[i]) / h[i] - h[i] * (2 * c_prime[i] + c_prime[i+1]) / 3
-        c = c_prime[i]
-        d = (c_prime[i+1] - c_prime[i]) / (3 * h[i])
-        return a + b * dx + c * dx**2 + d * dx**3
+    return CubicSpline(x_points, y_points)(x)
     
+class RunningLinearRegression:
+    """
+    Streaming least-squares line y = slope*x + intercept.
+
+    Keeps Welford-style running means and co-moments, so update() is O(1),
+    partial fits from separate shards can be combined with merge(), and the
+    slope, intercept and r^2 are available at any moment without rescanning
+    the history.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.m2_x = 0.0  # sum of (x - mean_x)**2
+        self.m2_y = 0.0  # sum of (y - mean_y)**2
+        self.c_xy = 0.0  # sum of (x - mean_x) * (y - mean_y)
+
+    @instrument()
+    def update(self, x, y):
+        """Add one point in O(1)"""
+        x = float(x)
+        y = float(y)
+        self.n += 1
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.mean_x += dx / self.n
+        self.mean_y += dy / self.n
+        self.m2_x += dx * (x - self.mean_x)
+        self.m2_y += dy * (y - self.mean_y)
+        self.c_xy += dx * (y - self.mean_y)
+        return self
+
+    @instrument()
+    def update_many(self, x_points, y_points):
+        """Add a batch of points with vectorized sums"""
+        x = np.asarray(x_points, dtype=float)
+        y = np.asarray(y_points, dtype=float)
+        if len(x) == 0:
+            return self
+
+        batch = RunningLinearRegression()
+        batch.n = len(x)
+        batch.mean_x = float(x.mean())
+        batch.mean_y = float(y.mean())
+        dx = x - batch.mean_x
+        dy = y - batch.mean_y
+        batch.m2_x = float(dx @ dx)
+        batch.m2_y = float(dy @ dy)
+        batch.c_xy = float(dx @ dy)
+        return self.merge(batch)
+
+    @instrument()
+    def merge(self, other):
+        """
+        Combine the statistics of another regression into this one.
+
+        Args:
+            other: RunningLinearRegression fitted on a different set of points
+
+        Returns:
+            self, now describing the union of both sets of points
+        """
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        weight = self.n * other.n / n
+
+        self.mean_x += dx * other.n / n
+        self.mean_y += dy * other.n / n
+        self.m2_x += other.m2_x + dx * dx * weight
+        self.m2_y += other.m2_y + dy * dy * weight
+        self.c_xy += other.c_xy + dx * dy * weight
+        self.n = n
+        return self
+
+    @property
+    def slope(self):
+        return self.c_xy / self.m2_x
+
+    @property
+    def intercept(self):
+        return self.mean_y - self.slope * self.mean_x
+
+    @property
+    def r_squared(self):
+        if self.m2_y == 0:
+            return 1.0
+        return self.c_xy * self.c_xy / (self.m2_x * self.m2_y)
+
+    @instrument("RunningLinearRegression.eval")
+    def __call__(self, x):
+        return self.slope * np.asarray(x, dtype=float) + self.intercept
+
+class RunningExponentialRegression:
+    """
+    Streaming exponential fit y = exp(intercept + slope*x).
+
+    A RunningLinearRegression on log(y). The logarithm is undefined for
+    non-positive heights, so those are rejected with a ValueError or, with
+    nonpositive='skip', left out of the fit and counted in skipped.
+
+    Args:
+        nonpositive: 'raise' or 'skip'
+    """
+
+    def __init__(self, nonpositive='raise'):
+        if nonpositive not in ('raise', 'skip'):
+            raise ValueError("nonpositive must be 'raise' or 'skip'")
+        self.nonpositive = nonpositive
+        self.skipped = 0
+        self.log_fit = RunningLinearRegression()
+
+    def _reject(self, count):
+        if self.nonpositive == 'raise':
+            raise ValueError("Exponential regression requires positive y values")
+        self.skipped += count
+
+    @instrument()
+    def update(self, x, y):
+        """Add one point in O(1)"""
+        if y <= 0:
+            self._reject(1)
+        else:
+            self.log_fit.update(x, np.log(y))
+        return self
+
+    @instrument()
+    def update_many(self, x_points, y_points):
+        """Add a batch of points with vectorized sums"""
+        x = np.asarray(x_points, dtype=float)
+        y = np.asarray(y_points, dtype=float)
+        positive = y > 0
+        if not positive.all():
+            self._reject(int((~positive).sum()))
+        self.log_fit.update_many(x[positive], np.log(y[positive]))
+        return self
+
+    @instrument()
+    def merge(self, other):
+        """Combine the statistics of another exponential regression into this one"""
+        self.log_fit.merge(other.log_fit)
+        self.skipped += other.skipped
+        return self
+
+    @property
+    def n(self):
+        return self.log_fit.n
+
+    @property
+    def slope(self):
+        return self.log_fit.slope
+
+    @property
+    def intercept(self):
+        return self.log_fit.intercept
+
+    @property
+    def r_squared(self):
+        """r^2 of the fit on the log scale"""
+        return self.log_fit.r_squared
+
+    @instrument("RunningExponentialRegression.eval")
+    def __call__(self, x):
+        return np.exp(self.intercept + self.slope * np.asarray(x, dtype=float))
+
+class LeastSquaresRegression:
+    """
+    Multivariate least squares y = intercept + X @ coefficients.
+
+    The fit is stored as the triangular factor R of a QR decomposition of the
+    design matrix together with Q^T y. update() stacks the new rows under R
+    and refactors only that block, so adding k rows costs O((p + k) p^2) no
+    matter how many rows were fitted before, and the normal equations (whose
+    conditioning is the square of the design matrix's) are never formed.
+
+    Args:
+        n_features: Number of explanatory variables, the columns of X
+    """
+
+    def __init__(self, n_features):
+        self.n_features = n_features
+        self.n = 0
+        self.r = np.zeros((0, n_features + 1))
+        self.qty = np.zeros(0)
+        self.rss = 0.0     # residual sum of squares
+        self.mean_y = 0.0
+        self.m2_y = 0.0    # sum of (y - mean_y)**2
+        self._beta = None
+
+    @instrument()
+    def update(self, X, y):
+        """
+        Add rows to the fit without refactoring the rows seen before.
+
+        Args:
+            X: k x n_features array of explanatory variables
+            y: k responses
+
+        Returns:
+            self
+        """
+        X = np.asarray(X, dtype=float).reshape(-1, self.n_features)
+        y = np.asarray(y, dtype=float).ravel()
+        if len(X) != len(y):
+            raise ValueError("X and y must have the same number of rows")
+        if len(y) == 0:
+            return self
+
+        design = np.column_stack([np.ones(len(y)), X])
+        rhs = np.concatenate([self.qty, y])
+        q, self.r = np.linalg.qr(np.vstack([self.r, design]))
+        self.qty = q.T @ rhs
+        # The part of rhs outside the column space of the stacked block is new residual
+        self.rss += max(float(rhs @ rhs - self.qty @ self.qty), 0.0)
+
+        n = self.n + len(y)
+        mean = float(y.mean())
+        delta = mean - self.mean_y
+        self.m2_y += float((y - mean) @ (y - mean)) + delta * delta * self.n * len(y) / n
+        self.mean_y += delta * len(y) / n
+        self.n = n
+        self._beta = None
+        return self
+
+    @property
+    def beta(self):
+        """Intercept followed by the coefficients (minimum norm if rank deficient)"""
+        if self._beta is None:
+            self._beta = np.linalg.lstsq(self.r, self.qty, rcond=None)[0]
+        return self._beta
+
+    @property
+    def intercept(self):
+        return float(self.beta[0])
+
+    @property
+    def coefficients(self):
+        return self.beta[1:]
+
+    @property
+    def r_squared(self):
+        if self.m2_y == 0:
+            return 1.0
+        return 1.0 - self.rss / self.m2_y
+
+    @instrument("LeastSquaresRegression.eval")
+    def __call__(self, X):
+        """
+        Predict for one row or a whole stack of scenarios in a single product.
+
+        Args:
+            X: Array of shape (..., n_features)
+
+        Returns:
+            Array of shape (...) with the predictions
+        """
+        return np.asarray(X, dtype=float) @ self.coefficients + self.intercept
+
+@instrument()
 def linear_regression(x_points, y_points):
     """
     Perform simple linear regression (y = mx + b).
@@ -125,21 +690,198 @@ def linear_regression(x_points, y_points):
     Returns:
         Tuple of (slope, intercept) and a prediction function
     """
-    n = len(x_points)
-    x_mean = sum(x_points) / n
-    y_mean = sum(y_points) / n
-    
-    numerator = sum((x - x_mean) * (y - y_mean) for x, y in zip(x_points, y_points))
-    denominator = sum((x - x_mean) ** 2 for x in x_points)
-    
-    slope = numerator / denominator
-    intercept = y_mean - slope * x_mean
+    model = RunningLinearRegression().update_many(x_points, y_points)
+    slope = model.slope
+    intercept = model.intercept
     
     def predict(x):
         return slope * x + intercept
     
     return (slope, intercept), predict
 
+def _compact_series(x_points, y_matrix, mask):
+    """
+    Move the valid entries of each padded series to the front.
+
+    Args:
+        x_points: Shared time grid of shape (n,) or per-series times (m, n)
+        y_matrix: Values of shape (m, n)
+        mask: Boolean (m, n) array, True where a value is present, or None
+
+    Returns:
+        Tuple of (x, y, lengths); x keeps the shared (n,) grid and lengths is
+        None when there is no mask, otherwise x is (m, n) and lengths counts
+        the valid leading entries of each series
+    """
+    x = np.asarray(x_points, dtype=float)
+    y = np.array(y_matrix, dtype=float)
+    if mask is None:
+        return x, y, None
+
+    mask = np.asarray(mask, dtype=bool)
+    order = np.argsort(~mask, axis=1, kind='stable')
+    x = np.take_along_axis(np.broadcast_to(x, y.shape), order, axis=1)
+    y = np.take_along_axis(y, order, axis=1)
+    lengths = mask.sum(axis=1)
+    valid = np.arange(y.shape[1]) < lengths[:, None]
+    return np.where(valid, x, 0.0), np.where(valid, y, 0.0), lengths
+
+@instrument()
+def fit_linear_regression_batch(x_points, y_matrix, mask=None):
+    """
+    Fit y = slope*x + intercept to many series at once.
+
+    Args:
+        x_points: Shared time grid of shape (n,) or per-series times (m, n)
+        y_matrix: Heights of shape (m, n), one series per row
+        mask: Optional boolean (m, n) array, False for padding in ragged series
+
+    Returns:
+        Tuple of (slopes, intercepts, r_squared) arrays of shape (m,)
+    """
+    y = np.asarray(y_matrix, dtype=float)
+    x = np.broadcast_to(np.asarray(x_points, dtype=float), y.shape)
+    mask = np.ones(y.shape, dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+
+    count = mask.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = np.where(mask, x, 0.0).sum(axis=1) / count
+        mean_y = np.where(mask, y, 0.0).sum(axis=1) / count
+        dx = np.where(mask, x - mean_x[:, None], 0.0)
+        dy = np.where(mask, y - mean_y[:, None], 0.0)
+        sxx = (dx * dx).sum(axis=1)
+        syy = (dy * dy).sum(axis=1)
+        sxy = (dx * dy).sum(axis=1)
+
+        slopes = sxy / sxx
+        intercepts = mean_y - slopes * mean_x
+        r_squared = np.where(syy == 0, 1.0, sxy * sxy / (sxx * syy))
+    return slopes, intercepts, r_squared
+
+@instrument()
+def fit_exponential_regression_batch(x_points, y_matrix, mask=None):
+    """
+    Fit y = exp(intercept + slope*x) to many series at once.
+
+    Non-positive heights have no logarithm and are left out of the fit, as
+    with RunningExponentialRegression(nonpositive='skip').
+
+    Args:
+        x_points: Shared time grid of shape (n,) or per-series times (m, n)
+        y_matrix: Heights of shape (m, n), one series per row
+        mask: Optional boolean (m, n) array, False for padding in ragged series
+
+    Returns:
+        Tuple of (slopes, intercepts, r_squared) arrays of shape (m,), on the log scale
+    """
+    y = np.asarray(y_matrix, dtype=float)
+    positive = y > 0
+    mask = positive if mask is None else positive & np.asarray(mask, dtype=bool)
+    log_y = np.log(np.where(mask, y, 1.0))
+    return fit_linear_regression_batch(x_points, log_y, mask)
+
+class BatchNewtonInterpolator:
+    """
+    Newton interpolating polynomials for many series at once.
+
+    The divided differences of every series are computed column by column
+    in one vectorized pass; evaluation runs Horner's scheme for all series
+    together and returns one row per series.
+
+    Args:
+        x_points: Shared time grid of shape (n,) or per-series times (m, n)
+        y_matrix: Heights of shape (m, n), one series per row
+        mask: Optional boolean (m, n) array, False for padding in ragged series
+    """
+
+    @instrument("BatchNewtonInterpolator.fit")
+    def __init__(self, x_points, y_matrix, mask=None):
+        self.x_points, coefficients, self.lengths = _compact_series(x_points, y_matrix, mask)
+        n = coefficients.shape[1]
+
+        # Entries past a series' length mix in padding; they are zeroed below
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for j in range(1, n):
+                coefficients[:, j:] = ((coefficients[:, j:] - coefficients[:, j-1:-1])
+                                       / (self.x_points[..., j:] - self.x_points[..., :-j]))
+        if self.lengths is not None:
+            coefficients[np.arange(n) >= self.lengths[:, None]] = 0.0
+            coefficients[self.lengths == 0] = np.nan
+        self.coefficients = coefficients
+
+    @instrument("BatchNewtonInterpolator.eval")
+    def __call__(self, x):
+        """
+        Evaluate every polynomial at x.
+
+        Args:
+            x: Point or 1-D array of points at which to estimate y
+
+        Returns:
+            Array of shape (m,) for a scalar x, otherwise (m, len(x))
+        """
+        x = np.asarray(x, dtype=float)
+        q = np.atleast_1d(x)
+        nodes = np.broadcast_to(self.x_points, self.coefficients.shape)
+        result = np.repeat(self.coefficients[:, -1:], len(q), axis=1)
+
+        for k in range(self.coefficients.shape[1] - 2, -1, -1):
+            result = result * (q - nodes[:, k, None]) + self.coefficients[:, k, None]
+
+        return result if x.ndim else result[:, 0]
+
+class BatchCubicSpline:
+    """
+    Natural cubic splines for many series at once.
+
+    With a shared time grid the tridiagonal matrix is the same for every
+    series, so it is eliminated once and applied to all right-hand sides.
+    Ragged series (given a mask) are compacted and solved as a batch of
+    systems in the same O(n) sweep.
+
+    Args:
+        x_points: Shared time grid of shape (n,) or per-series times (m, n)
+        y_matrix: Heights of shape (m, n), one series per row
+        mask: Optional boolean (m, n) array, False for padding in ragged series
+    """
+
+    @instrument("BatchCubicSpline.fit")
+    def __init__(self, x_points, y_matrix, mask=None):
+        self.x_points, y, self.lengths = _compact_series(x_points, y_matrix, mask)
+        self.a, self.b, self.c, self.d = _natural_spline_coefficients(self.x_points, y, self.lengths)
+
+    def _segments(self, q):
+        n = self.x_points.shape[-1]
+        if self.lengths is None:
+            i = np.clip(np.searchsorted(self.x_points, q) - 1, 0, n - 2)
+            i = np.broadcast_to(i, (self.a.shape[0], len(q)))
+            return i, q - self.x_points[i]
+
+        i = np.empty((len(self.lengths), len(q)), dtype=int)
+        for row, (nodes, length) in enumerate(zip(self.x_points, self.lengths)):
+            i[row] = np.searchsorted(nodes[:length], q) - 1
+        i = np.clip(i, 0, np.maximum(self.lengths - 2, 0)[:, None])
+        return i, q - np.take_along_axis(self.x_points, i, axis=1)
+
+    @instrument("BatchCubicSpline.eval")
+    def __call__(self, x):
+        """
+        Evaluate every spline at x.
+
+        Args:
+            x: Point or 1-D array of points at which to estimate y
+
+        Returns:
+            Array of shape (m,) for a scalar x, otherwise (m, len(x))
+        """
+        x = np.asarray(x, dtype=float)
+        i, dx = self._segments(np.atleast_1d(x))
+        a, b, c, d = (np.take_along_axis(coef, i, axis=1) for coef in (self.a, self.b, self.c, self.d))
+        result = ((d * dx + c) * dx + b) * dx + a
+        if self.lengths is not None:
+            result[self.lengths < 2] = np.nan
+        return result if x.ndim else result[:, 0]
+
 # if __name__ == '__main__' :
 #     # Example data points
 #     x_data = [0, 1, 2, 3, 4]
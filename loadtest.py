@@ -0,0 +1,112 @@
+"""
+Load test for service.py.
+
+Opens a number of keep-alive connections to a running service and sends
+/predict requests from all of them at once, cycling through datasets and
+methods, then reports throughput and latency percentiles.
+
+Example:
+    python service.py --port 8765 &
+    python loadtest.py --port 8765 --connections 32 --requests 5000 --days 50
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+
+import numpy as np
+
+async def _request(reader, writer, verb, path, payload=None):
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(f"{verb} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode('latin-1').partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+async def _client(host, port, queries, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for query in queries:
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, "POST", "/predict", query)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+async def run(host, port, connections, requests, days, methods=None):
+    """
+    Run the load test and return its statistics.
+
+    Args:
+        host: Service host
+        port: Service port
+        connections: Number of concurrent keep-alive connections
+        requests: Total number of /predict requests
+        days: Number of query days per request
+        methods: Methods to cycle through (None uses every method of the service)
+
+    Returns:
+        Dict with requests, errors, seconds, throughput and latency percentiles (ms)
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    _, datasets = await _request(reader, writer, "GET", "/datasets")
+    if methods is None:
+        _, methods = await _request(reader, writer, "GET", "/methods")
+    writer.close()
+
+    # The environmental model only applies to datasets with sensor rows
+    combos = itertools.cycle([(d["name"], method) for d in datasets for method in methods
+                              if method != "Regresión Ambiental" or d["sensor_rows"]])
+    query_days = np.linspace(0, 20, days).tolist()
+    queries = [{"dataset": name, "method": method, "days": query_days}
+               for name, method in itertools.islice(combos, requests)]
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, queries[i::connections], latencies, errors)
+                           for i in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    return {"requests": len(latencies), "errors": len(errors), "seconds": elapsed,
+            "throughput_rps": len(latencies) / elapsed,
+            "p50_ms": float(np.percentile(ms, 50)), "p99_ms": float(np.percentile(ms, 99)),
+            "max_ms": float(ms.max())}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio de predicción")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=20,
+                        help="días consultados por petición")
+    parser.add_argument("--methods", nargs="*", default=None)
+    parser.add_argument("-o", "--output", help="guardar los resultados en JSON")
+    args = parser.parse_args(argv)
+
+    stats = asyncio.run(run(args.host, args.port, args.connections, args.requests,
+                            args.days, args.methods))
+    print(f"{stats['requests']} peticiones en {stats['seconds']:.2f} s "
+          f"({stats['throughput_rps']:.0f} peticiones/s), {stats['errors']} errores")
+    print(f"latencia p50 {stats['p50_ms']:.2f} ms  p99 {stats['p99_ms']:.2f} ms  "
+          f"máx {stats['max_ms']:.2f} ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(stats, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,52 @@
-import numpy as np
+import startup
+import glob
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+startup.mark("import matplotlib")
 import tkinter as tk
-from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
-from scipy.interpolate import lagrange, interp1d
-from scipy.stats import linregress
+from tkinter import ttk, messagebox, filedialog
 import os
-from datasets import load_dataB
+startup.mark("import tkinter")
+# SciPy, pandas and PIL are imported lazily by the code paths that need them
+from datasets import (DEFAULT_DATA, ENVIRONMENT_DATASETS, load_environment,
+                      parse_measurements, read_measurements)
+from models import AUTO_METHOD, METHODS, FitCache
+from plotting import CURVE_LABELS, GrowthPlot, chart_title, sample_curve
+from profiling import instrument
+from worker import FitWorker
+startup.mark("import project modules")
+
+ICON_PATH = "plant_icon.png"
+ICON_SIZE = (250, 250)
+
+def load_icon(path, size):
+    """
+    Return path resized to size as a Tk image.
+
+    The resized copy is stored as a PNG next to the source with the source
+    mtime in its name, so it is regenerated (with PIL) only when the icon
+    changes and is otherwise loaded by Tk without PIL. When the folder is
+    not writable the icon is resized in memory on every start instead.
+    """
+    folder, name = os.path.split(path)
+    prefix = os.path.join(folder, f".{os.path.splitext(name)[0]}.{size[0]}x{size[1]}")
+    cache = f"{prefix}.{os.stat(path).st_mtime_ns}.png"
+    if os.path.exists(cache):
+        return tk.PhotoImage(file=cache)
+
+    from PIL import Image
+    icon = Image.open(path).resize(size, Image.LANCZOS)
+    for stale in glob.glob(f"{prefix}.*.png"):
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+    try:
+        icon.save(cache)
+    except OSError:
+        from PIL import ImageTk
+        return ImageTk.PhotoImage(icon)
+    return tk.PhotoImage(file=cache)
 
 class PlantGrowthInterpolator:
     def __init__(self, root):
@@ -17,20 +56,17 @@ class PlantGrowthInterpolator:
         self.root.configure(bg='#283618')  # Dark green background
         
         # Datos de ejemplo (tiempo en días, altura en cm)
-        self.default_data = {
-            "Basil": np.array([[0,1,4,5,6,7,8,9,11,12],
-                               [7.22,7.5,8,12,15,18,24,37,42,54]]), #https://data.mendeley.com/datasets/vx4jy7wyvd/1/files/05bbf7c4-7bb6-445e-977e-fea44c9ab7b7
-            "Espinaca": np.array([[0,3,6,9,12,15,18,21], 
-                              [1.50,3.20,4.65,6.10,8.00,9.30,11.40,13.50]]),#Rubatzky, V. E., & Yamaguchi, M. (1997). World Vegetables: Principles, Production, and Nutritive Values. Springer.
-            "Semilla de maiz": np.array([[0, 3, 6, 9, 12, 15, 18, 21, 24], 
-                                         [0, 1, 1, 1.4, 2.75, 5.5, 7.2, 9.5, 10]])#https://es.slideshare.net/slideshow/informe-experimento-plantas-1/10832712?utm_source=chatgpt.com
-        }
+        self.default_data = DEFAULT_DATA
+        # Registros con sensores, leídos al seleccionarlos por primera vez
+        self.environment_data = {}
         
         self.current_data = None
         self.selected_plant = tk.StringVar()
         self.selected_method = tk.StringVar(value="Lagrange")
         self.time_input = tk.DoubleVar()
         self.custom_data = None
+        self.fit_cache = FitCache(maxsize=32)
+        self.worker = FitWorker(self.root, on_busy=self.set_busy)
         
         self.create_widgets()
         self.load_plant_data("Basil")
@@ -65,20 +101,19 @@ class PlantGrowthInterpolator:
         
         # Imagen decorativa
         try:
-            img = Image.open("plant_icon.png") if os.path.exists("plant_icon.png") else None
-            if img:
-                img = img.resize((250, 250), Image.LANCZOS)
-                self.plant_img = ImageTk.PhotoImage(img)
+            if os.path.exists(ICON_PATH):
+                self.plant_img = load_icon(ICON_PATH, ICON_SIZE)
                 img_label = ttk.Label(main_frame, image=self.plant_img)
                 img_label.grid(row=1, column=2, rowspan=4, padx=10)
         except Exception as e:
             print(f"Error loading image: {e}")
+        startup.mark("icon")
         
         # Selección de planta
         plant_frame = ttk.LabelFrame(main_frame, text="Seleccionar Planta", padding=10)
         plant_frame.grid(row=1, column=0, columnspan=2, sticky="ew", pady=5)
         
-        for i, plant in enumerate(self.default_data.keys()):
+        for i, plant in enumerate([*self.default_data, *ENVIRONMENT_DATASETS]):
             rb = ttk.Radiobutton(plant_frame, text=plant, variable=self.selected_plant, 
                                 value=plant, command=lambda: self.load_plant_data(self.selected_plant.get()))
             rb.grid(row=0, column=i, padx=5, pady=5)
@@ -94,25 +129,31 @@ class PlantGrowthInterpolator:
         method_frame = ttk.LabelFrame(main_frame, text="Método de Estimación", padding=10)
         method_frame.grid(row=2, column=0, columnspan=2, sticky="ew", pady=5)
         
-        methods = ["Lagrange", "Newton", "Splines", "Regresión Lineal", "Regresión Exponencial"]
+        methods = METHODS
         for i, method in enumerate(methods):
             rb = ttk.Radiobutton(method_frame, text=method, variable=self.selected_method, 
-                                value=method)
+                                value=method, command=self.on_method_change)
             rb.grid(row=0, column=i, padx=5, pady=5)
         
         # Tooltip for methods
         self.method_tooltips = {
             "Lagrange": "Polinomio que pasa exactamente por todos los puntos",
             "Newton": "Polinomio usando diferencias divididas (más eficiente que Lagrange)",
+            "Polinomio Local": "Polinomios cúbicos por tramos sobre puntos vecinos (estable en series largas)",
             "Splines": "Interpolación suave por segmentos cúbicos",
             "Regresión Lineal": "Ajuste lineal por mínimos cuadrados",
-            "Regresión Exponencial": "Ajuste exponencial (y = a*e^(b*x))"
+            "Regresión Exponencial": "Ajuste exponencial (y = a*e^(b*x))",
+            "Regresión Ambiental": "Mínimos cuadrados sobre el tiempo y los sensores (temperatura, humedad, radiación, pH, TDS, área verde)",
+            AUTO_METHOD: "Elige el método con menor error de validación cruzada (dejando un punto fuera)"
         }
         
+        # Leyenda de la curva ajustada
+        self.method_labels = CURVE_LABELS
+        
         # Add tooltip functionality
         for method in methods:
             rb = ttk.Radiobutton(method_frame, text=method, variable=self.selected_method, 
-                                value=method)
+                                value=method, command=self.on_method_change)
             rb.grid(row=0, column=i, padx=5, pady=5)
             rb.bind("<Enter>", lambda e, m=method: self.show_tooltip(m))
             rb.bind("<Leave>", lambda e: self.hide_tooltip())
@@ -135,6 +176,11 @@ class PlantGrowthInterpolator:
         calc_btn = ttk.Button(input_frame, text="Calcular", command=self.calculate_growth)
         calc_btn.grid(row=0, column=2, padx=5)
         
+        # Indicador de cálculo en segundo plano
+        self.progress = ttk.Progressbar(input_frame, mode='indeterminate', length=80)
+        self.progress.grid(row=0, column=3, padx=5)
+        self.progress.grid_remove()
+        
         # Resultados
         self.result_label = ttk.Label(main_frame, text="Resultado: ", font=("urw gothic l", 12, 'bold'), 
                                     foreground="#BC6C25")
@@ -145,9 +191,19 @@ class PlantGrowthInterpolator:
         self.canvas = FigureCanvasTkAgg(self.figure, master=main_frame)
         self.canvas_widget = self.canvas.get_tk_widget()
         self.canvas_widget.grid(row=5, column=0, columnspan=3, pady=20)
+        self.plot = GrowthPlot(self.figure, self.ax, self.canvas)
+        self.plot_data = None
+        self.plot_key = None
+        
+        startup.mark("widgets")
         
         # Actualizar gráfico inicial
         self.update_plot()
+        startup.mark("first draw")
+    
+    def on_method_change(self):
+        # Debounce so clicking through several methods only fits the last one
+        self.update_plot(delay_ms=150)
     
     def show_tooltip(self, method):
         self.tooltip_label.config(text=self.method_tooltips[method])
@@ -158,63 +214,29 @@ class PlantGrowthInterpolator:
     
     def validate_data(self, data_str):
         """Validate and parse custom data input"""
-        lines = data_str.strip().split('\n')
-        if len(lines) < 2:
-            raise ValueError("Se requieren al menos 2 puntos de datos")
-        
-        data = []
-        for i, line in enumerate(lines):
-            if not line.strip():
-                continue
-            parts = line.strip().split()
-            if len(parts) != 2:
-                raise ValueError(f"Línea {i+1}: Cada línea debe contener exactamente 2 números (tiempo y altura)")
-            try:
-                t, h = map(float, parts)
-                if t < 0 or h < 0:
-                    raise ValueError("Los valores no pueden ser negativos")
-                data.append([t, h])
-            except ValueError as e:
-                raise ValueError(f"Línea {i+1}: Datos inválidos - {str(e)}")
-        
-        data = np.array(data).T
-        if len(np.unique(data[0])) != len(data[0]):
-            raise ValueError("Los valores de tiempo deben ser únicos")
-        
-        return data
-    
-    def newton_interpolation(self, x_data, y_data, x):
-        """Newton's divided differences interpolation"""
-        n = len(x_data)
-        coef = np.zeros([n, n])
-        coef[:,0] = y_data
-        
-        # Calculate divided differences
-        for j in range(1, n):
-            for i in range(n - j):
-                coef[i][j] = (coef[i+1][j-1] - coef[i][j-1]) / (x_data[i+j] - x_data[i])
-        
-        # Evaluate the polynomial
-        result = coef[0,0]
-        for j in range(1, n):
-            term = coef[0,j]
-            for k in range(j):
-                term *= (x - x_data[k])
-            result += term
-        
-        return result
+        # Parsed in one vectorized pass; repeated times are still rejected here
+        return parse_measurements(data_str)
     
     def load_plant_data(self, plant_name):
         """Load predefined plant data"""
-        self.current_data = self.default_data[plant_name]
+        if plant_name in ENVIRONMENT_DATASETS:
+            if plant_name not in self.environment_data:
+                try:
+                    self.environment_data[plant_name] = load_environment(ENVIRONMENT_DATASETS[plant_name])
+                except Exception as e:
+                    messagebox.showerror("Error", f"No se pudo leer el registro de sensores:\n{str(e)}")
+                    return
+            self.current_data = self.environment_data[plant_name]
+        else:
+            self.current_data = self.default_data[plant_name]
         self.custom_data = None
-        self.update_plot()
+        self.update_plot(delay_ms=150)
         
     def load_custom_data(self):
         """Open window for custom data input"""
         custom_window = tk.Toplevel(self.root)
         custom_window.title("Ingresar Datos Personalizados")
-        custom_window.geometry("500x400")
+        custom_window.geometry("500x520")
         custom_window.configure(bg='#283618')
         
         frame = ttk.Frame(custom_window, padding="20")
@@ -228,21 +250,50 @@ class PlantGrowthInterpolator:
         text_area.pack(pady=10, padx=20)
         text_area.insert(tk.END, "0 0\n1 2\n2 5\n3 9\n4 15\n5 22\n6 30\n7 40")
         
-        def save_data():
+        def use_data(parse):
             try:
-                data = self.validate_data(text_area.get("1.0", tk.END))
+                data = parse()
                 self.custom_data = data
                 self.current_data = data
                 self.selected_plant.set("Personalizado")
                 self.update_plot()
                 custom_window.destroy()
-                messagebox.showinfo("Éxito", "Datos cargados correctamente")
+                messagebox.showinfo("Éxito", f"{data.shape[1]} puntos cargados correctamente")
             except Exception as e:
                 messagebox.showerror("Error", f"Datos inválidos:\n{str(e)}")
         
-        save_btn = ttk.Button(frame, text="Guardar Datos", command=save_data)
+        save_btn = ttk.Button(frame, text="Guardar Datos",
+                              command=lambda: use_data(lambda: self.validate_data(text_area.get("1.0", tk.END))))
         save_btn.pack(pady=10)
         
+        # Importación masiva: los datos van directo a current_data sin pasar por el cuadro de texto
+        bulk_frame = ttk.Frame(frame)
+        bulk_frame.pack(pady=5)
+        merge_duplicates = tk.BooleanVar(value=True)
+        ttk.Checkbutton(bulk_frame, text="Ordenar y promediar tiempos repetidos",
+                        variable=merge_duplicates).grid(row=0, column=0, columnspan=2, pady=5)
+        
+        def bulk_options():
+            return dict(sort=True, duplicates='mean' if merge_duplicates.get() else 'raise')
+        
+        def import_file():
+            path = filedialog.askopenfilename(parent=custom_window, title="Importar datos",
+                                              filetypes=[("Texto", "*.txt *.dat *.tsv"), ("Todos", "*.*")])
+            if path:
+                use_data(lambda: read_measurements(path, **bulk_options()))
+        
+        def paste_clipboard():
+            try:
+                text = self.root.clipboard_get()
+            except tk.TclError:
+                messagebox.showerror("Error", "El portapapeles está vacío")
+                return
+            use_data(lambda: parse_measurements(text, **bulk_options()))
+        
+        ttk.Button(bulk_frame, text="Importar Archivo...", command=import_file).grid(row=1, column=0, padx=5)
+        ttk.Button(bulk_frame, text="Pegar del Portapapeles", command=paste_clipboard).grid(row=1, column=1, padx=5)
+        
+    @instrument()
     def calculate_growth(self):
         """Calculate plant growth at specified time using selected method"""
         if self.current_data is None:
@@ -251,7 +302,6 @@ class PlantGrowthInterpolator:
             
         t = self.time_input.get()
         time_data = self.current_data[0]
-        growth_data = self.current_data[1]
         
         # Check for single data point
         if len(time_data) == 1:
@@ -264,94 +314,100 @@ class PlantGrowthInterpolator:
                                      "El tiempo está fuera del rango de datos. ¿Desea extrapolar?"):
             return
         
-        try:
-            method = self.selected_method.get()
-            height = 0
-            
-            if method == "Lagrange":
-                poly = lagrange(time_data, growth_data)
-                height = poly(t)
-            elif method == "Newton":
-                height = self.newton_interpolation(time_data, growth_data, t)
-            elif method == "Splines":
-                spline = interp1d(time_data, growth_data, kind='cubic', fill_value='extrapolate')
-                height = spline(t)
-            elif method == "Regresión Lineal":
-                slope, intercept, _, _, _ = linregress(time_data, growth_data)
-                height = slope * t + intercept
-            elif method == "Regresión Exponencial":
-                log_y = np.log(growth_data)
-                slope, intercept, _, _, _ = linregress(time_data, log_y)
-                height = np.exp(intercept + slope * t)
-            
-            self.result_label.config(text=f"Resultado: En el día {t:.1f}, la planta tendrá una altura de {height:.2f} cm")
+        method = self.selected_method.get()
+        data = self.current_data
+        
+        def job():
+            model = self.fit_cache.get(method, data)
+            return model(t), self.fit_curve(method, data), model
+        
+        def done(result, error):
+            if error is not None:
+                messagebox.showerror("Error", f"No se pudo calcular:\n{str(error)}")
+                return
+            height, curve, model = result
+            self.result_label.config(text=f"Resultado: En el día {t:.1f}, la planta tendrá una altura de {height:.2f} cm"
+                                          + self.selection_text(method, model))
             
             # Update plot with the calculated point
-            self.update_plot(highlight_point=(t, height))
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo calcular:\n{str(e)}")
+            self.render_plot(data, method, curve, highlight_point=(t, height))
+        
+        # The fit runs on the worker thread; a newer plot request supersedes it
+        self.worker.submit(job, done, channel="plot")
+    
+    def selection_text(self, method, model):
+        """Chosen method and its cross-validation error, for the automatic mode"""
+        if method != AUTO_METHOD:
+            return ""
+        return f"\nMétodo elegido: {model.method} (error de validación cruzada: {model.loo_rmse:.2f} cm)"
     
-    def update_plot(self, highlight_point=None):
+    def plot_title(self, method):
+        return chart_title(self.selected_plant.get(), method)
+    
+    @instrument()
+    def fit_curve(self, method, data):
+        """Fit the method and sample the 200-point curve (runs on the worker thread)"""
+        if len(data[0]) < 2:
+            return None
+        return sample_curve(self.fit_cache.get(method, data), data[0])
+    
+    @instrument()
+    def update_plot(self, highlight_point=None, delay_ms=0):
         """Update the growth plot with current data and method"""
-        self.ax.clear()
+        method = self.selected_method.get()
+        data = self.current_data
         
-        if self.current_data is not None:
-            time_data = self.current_data[0]
-            growth_data = self.current_data[1]
-            
-            # Plot data points
-            self.ax.scatter(time_data, growth_data, color='#2e7d32', s=100, 
-                           label='Datos observados', zorder=3)
-            
-            # Plot interpolation/regression
-            if len(time_data) > 1:
-                fine_time = np.linspace(min(time_data), max(time_data), 200)
-                
-                method = self.selected_method.get()
-                if method in ["Lagrange", "Newton"]:
-                    poly = lagrange(time_data, growth_data)
-                    self.ax.plot(fine_time, poly(fine_time), '--', color='#7cb342', 
-                                label='Interpolación polinómica', linewidth=2)
-                elif method == "Splines":
-                    spline = interp1d(time_data, growth_data, kind='cubic')
-                    self.ax.plot(fine_time, spline(fine_time), '--', color='#7cb342', 
-                                label='Interpolación por splines cúbicos', linewidth=2)
-                elif method == "Regresión Lineal":
-                    slope, intercept, _, _, _ = linregress(time_data, growth_data)
-                    self.ax.plot(fine_time, slope*fine_time + intercept, '--', color='#7cb342', 
-                                label='Regresión lineal', linewidth=2)
-                elif method == "Regresión Exponencial":
-                    log_y = np.log(growth_data)
-                    slope, intercept, _, _, _ = linregress(time_data, log_y)
-                    self.ax.plot(fine_time, np.exp(intercept + slope*fine_time), '--', 
-                                color='#7cb342', label='Regresión exponencial', linewidth=2)
-            
-            # Highlight calculated point
-            if highlight_point:
-                t, h = highlight_point
-                self.ax.scatter([t], [h], color='#d32f2f', s=150, 
-                              label='Estimación actual', zorder=5)
-                self.ax.annotate(f'{h:.1f} cm', (t, h), textcoords="offset points", 
-                               xytext=(10,10), ha='center', color='#d32f2f', 
-                               fontsize=10, bbox=dict(boxstyle='round,pad=0.5', 
-                               fc='white', alpha=0.7))
-        
-        # Configure plot appearance
-        self.ax.set_facecolor('#e8f5e9')
-        title = f"Crecimiento de la Planta: {self.selected_plant.get()}"
-        if self.selected_method.get() in ["Regresión Lineal", "Regresión Exponencial"]:
-            title += f" ({self.selected_method.get()})"
-        self.ax.set_title(title, pad=20, fontsize=12)
-        self.ax.set_xlabel('Tiempo (días)', color='#2e7d32', fontsize=10)
-        self.ax.set_ylabel('Altura (cm)', color='#2e7d32', fontsize=10)
-        self.ax.grid(True, linestyle='--', alpha=0.7)
-        self.ax.legend(facecolor='#e8f5e9', framealpha=0.8)
-        
-        self.figure.tight_layout()
-        self.canvas.draw()
+        # Nothing to fit: empty chart, or only the highlight changed
+        if data is None or (data is self.plot_data and (method, self.plot_title(method)) == self.plot_key):
+            self.worker.cancel("plot")
+            self.render_plot(data, method, None, highlight_point)
+            return
+        
+        def done(curve, error):
+            if error is not None:
+                messagebox.showerror("Error", f"No se pudo ajustar el modelo:\n{str(error)}")
+                return
+            model = self.fit_cache.peek(method, data) if method == AUTO_METHOD else None
+            if model is not None:
+                self.result_label.config(text="Resultado: " + self.selection_text(method, model).strip())
+            self.render_plot(data, method, curve, highlight_point)
+        
+        self.worker.submit(lambda: self.fit_curve(method, data), done,
+                           channel="plot", delay_ms=delay_ms)
+    
+    @instrument()
+    def render_plot(self, data, method, curve, highlight_point=None):
+        """Draw a fitted curve on the Tk thread"""
+        title = self.plot_title(method)
+        
+        # Only rebuild the series when the data, method or title changed
+        if data is not self.plot_data or (method, title) != self.plot_key:
+            time_data = growth_data = None
+            if data is not None:
+                time_data = data[0]
+                growth_data = data[1]
+            self.plot.set_series(time_data, growth_data, curve, self.method_labels[method], title)
+            self.plot_data = data
+            self.plot_key = (method, title)
+        
+        # Highlight calculated point
+        self.plot.set_highlight(highlight_point)
+        self.plot.refresh()
+    
+    def set_busy(self, busy):
+        """Show the progress bar while the worker is fitting"""
+        if busy:
+            self.progress.grid()
+            self.progress.start(10)
+        else:
+            self.progress.stop()
+            self.progress.grid_remove()
         
 if __name__ == "__main__":
     root = tk.Tk()
+    startup.mark("tk root")
     app = PlantGrowthInterpolator(root)
+    root.update_idletasks()
+    startup.mark("window ready")
+    startup.report()
     root.mainloop()
@@ -0,0 +1,255 @@
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from interpolation import (CubicSpline, LagrangeInterpolator, LeastSquaresRegression, LocalPolynomialInterpolator,
+                           NewtonInterpolator, RunningExponentialRegression, RunningLinearRegression)
+from profiling import instrument
+from selection import loo_scores
+
+AUTO_METHOD = "Automático"
+METHODS = ["Lagrange", "Newton", "Polinomio Local", "Splines", "Regresión Lineal", "Regresión Exponencial",
+           "Regresión Ambiental", AUTO_METHOD]
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+class EnvironmentalGrowthModel:
+    """
+    Height as a linear function of time and the sensor readings.
+
+    The readings at a queried time are interpolated linearly between the
+    measurement days (and held at the first or last reading outside them),
+    so the model can be called with times alone like the other methods.
+    predict() takes explicit readings instead, for what-if scenarios.
+
+    Args:
+        time_data: Array of measurement times (days)
+        growth_data: Array of measured heights (cm)
+        environment: k x n array with one row per sensor column
+    """
+
+    @instrument("EnvironmentalGrowthModel.fit")
+    def __init__(self, time_data, growth_data, environment):
+        self.time_data = np.empty(0)
+        self.environment = np.empty((len(environment), 0))
+        self.regression = LeastSquaresRegression(1 + len(environment))
+        self.update(time_data, growth_data, environment)
+
+    def update(self, time_data, growth_data, environment):
+        """Add new measurements, e.g. one more day, without refitting the old ones"""
+        time_data = np.asarray(time_data, dtype=float)
+        environment = np.asarray(environment, dtype=float).reshape(len(self.environment), -1)
+        self.regression.update(np.column_stack([time_data, environment.T]), growth_data)
+
+        times = np.concatenate([self.time_data, time_data])
+        order = np.argsort(times, kind='stable')
+        self.time_data = times[order]
+        self.environment = np.concatenate([self.environment, environment], axis=1)[:, order]
+        return self
+
+    def environment_at(self, t):
+        """Interpolated readings at t, with shape t.shape + (k,)"""
+        t = np.asarray(t, dtype=float)
+        return np.stack([np.interp(t, self.time_data, row) for row in self.environment], axis=-1)
+
+    def predict(self, t, environment):
+        """
+        Heights at times t under the given readings, all in one matrix product.
+
+        Args:
+            t: Time or array of times, broadcast against environment[..., 0]
+            environment: Array of shape (..., k) of sensor readings
+
+        Returns:
+            Array of predicted heights
+        """
+        environment = np.asarray(environment, dtype=float)
+        t = np.broadcast_to(np.asarray(t, dtype=float), environment.shape[:-1])
+        return self.regression(np.concatenate([t[..., None], environment], axis=-1))
+
+    @instrument("EnvironmentalGrowthModel.eval")
+    def __call__(self, t):
+        return self.predict(t, self.environment_at(t))
+
+class SelectedModel:
+    """
+    Model of the method with the lowest leave-one-out error.
+
+    Args:
+        method: Name of the chosen method
+        scores: Dict of method name to leave-one-out RMSE (cm)
+        model: The chosen method fitted to all points
+    """
+
+    def __init__(self, method, scores, model):
+        self.method = method
+        self.scores = scores
+        self.model = model
+
+    @property
+    def loo_rmse(self):
+        return self.scores[self.method]
+
+    def __call__(self, t):
+        return self.model(t)
+
+def select_model(time_data, growth_data, environment=None):
+    """
+    Score every method by leave-one-out cross-validation and fit the best.
+
+    Lagrange and Newton build the same polynomial, so only Newton is scored.
+    The spline candidate is the natural CubicSpline that is scored, not the
+    not-a-knot spline of the "Splines" method, so the reported error is the
+    error of the model that is returned.
+
+    Returns:
+        SelectedModel
+    """
+    methods = [m for m in METHODS if m not in ("Lagrange", AUTO_METHOD)]
+    if environment is None:
+        methods.remove("Regresión Ambiental")
+    scores = loo_scores(time_data, growth_data, environment, methods)
+    valid = {m: s for m, s in scores.items() if np.isfinite(s)}
+    if not valid:
+        raise ValueError("Se requieren al menos 3 puntos de datos para la selección automática")
+    best = min(valid, key=valid.get)
+    if best == "Splines":
+        order = np.argsort(time_data, kind='stable')
+        model = CubicSpline(np.asarray(time_data)[order], np.asarray(growth_data)[order])
+    else:
+        model = fit_model(best, time_data, growth_data, environment)
+    return SelectedModel(best, scores, model)
+
+def environment_rows(data):
+    """Sensor reading rows of a dataset array, or None for plain (time, height) data"""
+    return data[2:] if len(data) > 2 else None
+
+@instrument()
+def fit_model(method, time_data, growth_data, environment=None):
+    """
+    Fit one of the estimation methods to a growth series.
+
+    Args:
+        method: Name of the method, one of METHODS
+        time_data: Array of measurement times (days)
+        growth_data: Array of measured heights (cm)
+        environment: Optional k x n array of sensor readings, used by
+            "Regresión Ambiental" (and AUTO_METHOD) and ignored by the others
+
+    Returns:
+        Callable model that maps a time or array of times to heights
+    """
+    if method == "Lagrange":
+        return LagrangeInterpolator(time_data, growth_data)
+    elif method == "Newton":
+        return NewtonInterpolator(time_data, growth_data)
+    elif method == "Polinomio Local":
+        return LocalPolynomialInterpolator(time_data, growth_data, degree=3)
+    elif method == "Splines":
+        from scipy.interpolate import interp1d  # deferred: SciPy is slow to import
+        return interp1d(time_data, growth_data, kind='cubic', fill_value='extrapolate')
+    elif method == "Regresión Lineal":
+        return RunningLinearRegression().update_many(time_data, growth_data)
+    elif method == "Regresión Exponencial":
+        # Alturas nulas o negativas no tienen logaritmo: se excluyen del ajuste
+        model = RunningExponentialRegression(nonpositive='skip').update_many(time_data, growth_data)
+        if model.n < 2:
+            raise ValueError("Se requieren al menos 2 alturas positivas para la regresión exponencial")
+        return model
+    elif method == "Regresión Ambiental":
+        if environment is None or len(environment) == 0:
+            raise ValueError("Los datos actuales no incluyen variables ambientales")
+        if len(time_data) < 2:
+            raise ValueError("Se requieren al menos 2 puntos de datos para la regresión ambiental")
+        return EnvironmentalGrowthModel(time_data, growth_data, environment)
+    elif method == AUTO_METHOD:
+        return select_model(time_data, growth_data, environment)
+    raise ValueError(f"Método desconocido: {method}")
+
+class FitCache:
+    """
+    LRU cache of fitted models keyed on dataset contents and method.
+
+    Safe to share between threads; fits themselves run outside the lock.
+
+    Args:
+        maxsize: Maximum number of fitted models kept in memory
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def data_key(data):
+        """Content hash of a dataset array"""
+        data = np.ascontiguousarray(data, dtype=float)
+        digest = hashlib.sha1(data.tobytes())
+        digest.update(str(data.shape).encode())
+        return digest.hexdigest()
+
+    def peek(self, method, data, count_hit=False):
+        """
+        Return the cached model for method and data, or None without fitting.
+
+        Args:
+            method: Name of the method, one of METHODS
+            data: Dataset array, as for get()
+            count_hit: Count a found model as a hit, for callers that serve
+                it as a get() would and fall back to get() on None
+
+        Returns:
+            Cached model or None; the hit and miss counters are left alone
+            unless count_hit is set
+        """
+        key = (self.data_key(data), method)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                if count_hit:
+                    self.hits += 1
+                self._models.move_to_end(key)
+            return model
+
+    @instrument()
+    def get(self, method, data):
+        """
+        Return the model for method fitted to data, fitting it on a miss.
+
+        Args:
+            method: Name of the method, one of METHODS
+            data: 2 x n array of (time, height) rows, optionally followed by
+                sensor reading rows (see datasets.load_environment)
+
+        Returns:
+            Callable fitted model
+        """
+        key = (self.data_key(data), method)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self.hits += 1
+                self._models.move_to_end(key)
+                return model
+            self.misses += 1
+
+        model = fit_model(method, data[0], data[1], environment_rows(data))
+        with self._lock:
+            self._models[key] = model
+            if len(self._models) > self.maxsize:
+                self._models.popitem(last=False)
+        return model
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._models))
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,246 @@
+"""
+Incremental rendering of the growth chart.
+
+GrowthPlot keeps one set of matplotlib artists alive and updates their data
+in place instead of clearing the axes on every calculation. Moving only the
+highlighted estimate is blitted over a cached background, the layout is
+recomputed only when the axes change, and long observed series are reduced
+with LTTB to roughly one point per horizontal pixel before drawing.
+"""
+import numpy as np
+
+from models import AUTO_METHOD
+from profiling import instrument
+
+# Leyenda de la curva ajustada
+CURVE_LABELS = {
+    "Lagrange": "Interpolación polinómica",
+    "Newton": "Interpolación polinómica",
+    "Polinomio Local": "Interpolación polinómica local",
+    "Splines": "Interpolación por splines cúbicos",
+    "Regresión Lineal": "Regresión lineal",
+    "Regresión Exponencial": "Regresión exponencial",
+    "Regresión Ambiental": "Regresión ambiental",
+    AUTO_METHOD: "Mejor método (validación cruzada)"
+}
+
+def chart_title(plant, method):
+    """Axes title of the growth chart, as shown by the GUI"""
+    title = f"Crecimiento de la Planta: {plant}"
+    if method in ["Regresión Lineal", "Regresión Exponencial", "Regresión Ambiental"]:
+        title += f" ({method})"
+    return title
+
+def lttb(x, y, n_out):
+    """
+    Downsample a series with Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last points and, from each of n_out - 2 buckets, the
+    point forming the largest triangle with the previously kept point and the
+    average of the next bucket, which preserves the visual shape of the curve.
+
+    Args:
+        x: Sorted x-coordinates
+        y: y-coordinates
+        n_out: Number of points to keep
+
+    Returns:
+        Tuple of downsampled (x, y) arrays
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0] = 0
+    keep[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+
+    return x[keep], y[keep]
+
+def sample_curve(model, time_data, points=200):
+    """(x, y) arrays of a fitted model over the range of the observed times"""
+    fine_time = np.linspace(np.min(time_data), np.max(time_data), points)
+    return fine_time, model(fine_time)
+
+class GrowthPlot:
+    """
+    Persistent artists for the observed points, fitted curve and estimate.
+
+    Typical use is set_series() when the data or method changes, then
+    set_highlight() and refresh(). refresh() blits when only the highlight
+    moved inside the current view and does a full draw otherwise.
+
+    Args:
+        figure: Matplotlib figure holding ax
+        ax: Axes to draw on
+        canvas: Canvas of the figure
+        blit: Draw the highlight as an animated artist and blit it; turn off
+            when the figure is only saved to files
+    """
+
+    def __init__(self, figure, ax, canvas, blit=True):
+        self.figure = figure
+        self.ax = ax
+        self.canvas = canvas
+        self.blit = blit
+
+        self.ax.set_facecolor('#e8f5e9')
+        self.ax.set_xlabel('Tiempo (días)', color='#2e7d32', fontsize=10)
+        self.ax.set_ylabel('Altura (cm)', color='#2e7d32', fontsize=10)
+        self.ax.grid(True, linestyle='--', alpha=0.7)
+
+        self.observed = self.ax.scatter([], [], color='#2e7d32', s=100,
+                                        label='Datos observados', zorder=3)
+        self.curve, = self.ax.plot([], [], '--', color='#7cb342', linewidth=2,
+                                   label='_nolegend_')
+        self.highlight = self.ax.scatter([], [], color='#d32f2f', s=150, label='_nolegend_',
+                                         zorder=5, animated=blit)
+        self.annotation = self.ax.annotate('', (0, 0), textcoords="offset points",
+                                           xytext=(10, 10), ha='center', color='#d32f2f',
+                                           fontsize=10, bbox=dict(boxstyle='round,pad=0.5',
+                                           fc='white', alpha=0.7), animated=blit, visible=False)
+
+        self._data_points = np.empty((0, 2))
+        self._legend_labels = None
+        self._layout_key = None
+        self._background = None
+        self._needs_draw = True
+        if blit:
+            self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        self.ax.draw_artist(self.highlight)
+        self.ax.draw_artist(self.annotation)
+
+    def _max_points(self):
+        # About one observed point per horizontal pixel of the axes
+        return max(int(self.ax.bbox.width), 100)
+
+    @instrument("GrowthPlot.set_series")
+    def set_series(self, time_data, growth_data, curve=None, curve_label=None, title=""):
+        """
+        Replace the observed points, fitted curve and title.
+
+        Args:
+            time_data: Observed times, or None for an empty chart
+            growth_data: Observed heights
+            curve: Optional (x, y) arrays of the fitted curve
+            curve_label: Legend label of the curve
+            title: Axes title
+        """
+        points = [np.empty((0, 2))]
+        if time_data is not None:
+            x, y = lttb(time_data, growth_data, self._max_points())
+            self.observed.set_offsets(np.column_stack([x, y]))
+            points.append(np.column_stack([time_data, growth_data]))
+        else:
+            self.observed.set_offsets(np.empty((0, 2)))
+
+        if curve is not None:
+            self.curve.set_data(*curve)
+            self.curve.set_label(curve_label)
+            points.append(np.column_stack(curve))
+        else:
+            self.curve.set_data([], [])
+            self.curve.set_label('_nolegend_')
+
+        self.ax.set_title(title, pad=20, fontsize=12)
+        self._data_points = np.concatenate(points)
+        self._needs_draw = True
+
+    def set_highlight(self, point):
+        """Show the estimate (t, h) as a red point with a label, or hide it with None"""
+        if point is None:
+            self.highlight.set_offsets(np.empty((0, 2)))
+            self.highlight.set_label('_nolegend_')
+            self.annotation.set_visible(False)
+            return
+
+        t, h = float(point[0]), float(point[1])
+        self.highlight.set_offsets([[t, h]])
+        self.highlight.set_label('Estimación actual')
+        self.annotation.xy = (t, h)
+        self.annotation.set_text(f'{h:.1f} cm')
+        self.annotation.set_visible(True)
+
+    def _autoscale(self):
+        points = self._data_points
+        if len(self.highlight.get_offsets()):
+            points = np.concatenate([points, self.highlight.get_offsets()])
+        if len(points):
+            self.ax.ignore_existing_data_limits = True
+            self.ax.update_datalim(points)
+        self.ax.autoscale_view()
+
+    def _update_artists(self):
+        """Rescale the axes and rebuild the legend if its entries changed"""
+        limits = (self.ax.get_xlim(), self.ax.get_ylim())
+        self._autoscale()
+        if (self.ax.get_xlim(), self.ax.get_ylim()) != limits:
+            self._needs_draw = True
+
+        labels = [artist.get_label() for artist in (self.observed, self.curve, self.highlight)]
+        if labels != self._legend_labels:
+            self.ax.legend(facecolor='#e8f5e9', framealpha=0.8)
+            self._legend_labels = labels
+            self._needs_draw = True
+
+    def _update_layout(self):
+        # The margins depend on whether there is a title and on the widest y
+        # tick label, not on the limits themselves. tight_layout costs a full
+        # draw, so it reruns only when the labels grow or shrink noticeably.
+        ticks = self.ax.yaxis.get_major_formatter().format_ticks(self.ax.get_yticks())
+        width = max(map(len, ticks), default=0)
+        shape = (bool(self.ax.get_title()), tuple(self.figure.get_size_inches()))
+        if self._layout_key is not None:
+            laid_out_shape, laid_out_width = self._layout_key
+            if shape == laid_out_shape and laid_out_width - 2 <= width <= laid_out_width:
+                return
+        self.figure.tight_layout()
+        self._layout_key = (shape, width)
+
+    @instrument("GrowthPlot.refresh")
+    def refresh(self):
+        """Redraw whatever changed since the last refresh"""
+        self._update_artists()
+
+        if not self._needs_draw and self.blit and self._background is not None:
+            # Only the highlight moved: restore the cached background and blit
+            self.canvas.restore_region(self._background)
+            self._draw_animated()
+            self.canvas.blit(self.ax.bbox)
+            return
+
+        self._update_layout()
+        self.canvas.draw()
+        self._needs_draw = False
+
+    @instrument("GrowthPlot.save")
+    def save(self, path, **kwargs):
+        """
+        Write the current chart to a file without drawing it on screen first.
+
+        Args:
+            path: Output file; the extension selects the format (png, svg, ...)
+            **kwargs: Passed on to Figure.savefig (e.g. dpi)
+        """
+        self._update_artists()
+        self._update_layout()
+        self.figure.savefig(path, facecolor=self.figure.get_facecolor(), **kwargs)
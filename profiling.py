@@ -0,0 +1,133 @@
+"""
+Opt-in timers and counters for the hot paths.
+
+Instrumentation is off unless the PLANTGROWTH_PROFILE environment variable
+is set when the program starts. While it is off, instrument() returns the
+decorated function unchanged and section() returns a shared no-op context,
+so the disabled cost is nil per call.
+
+When it is on, every instrumented call records its count, total and
+maximum time and input size. At exit two files are written:
+<prefix>.json with the per-function summary, and <prefix>.folded with
+collapsed stacks weighted by self time in microseconds. The .folded file
+can be passed to flamegraph.pl or opened in speedscope. The prefix is
+"plantgrowth_profile" when the variable is "1", otherwise the variable's
+value without extension. Only the calling process is recorded, so run
+batch.py with --workers 1 when profiling it.
+
+Example:
+    PLANTGROWTH_PROFILE=1 python batch.py --days 5 10 --workers 1
+"""
+import atexit
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+_setting = os.environ.get("PLANTGROWTH_PROFILE", "")
+ENABLED = _setting not in ("", "0")
+
+_lock = threading.Lock()
+_stats = {}
+_folded = Counter()
+_local = threading.local()
+_null_section = contextlib.nullcontext()
+
+def _input_size(args):
+    """Length of the first array-like argument (the time axis for 2-D arrays)"""
+    for arg in args:
+        if isinstance(arg, np.ndarray):
+            return arg.shape[-1] if arg.ndim else 1
+        if isinstance(arg, (list, tuple)):
+            return len(arg)
+    return None
+
+def _enter(name):
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    # Each frame is [name, time spent in instrumented children]
+    stack.append([name, 0.0])
+    return stack
+
+def _exit(stack, elapsed, size):
+    name, children = stack.pop()
+    path = ";".join(frame[0] for frame in stack + [[name]])
+    if stack:
+        stack[-1][1] += elapsed
+
+    with _lock:
+        entry = _stats.get(name)
+        if entry is None:
+            entry = _stats[name] = {"calls": 0, "total_s": 0.0, "max_s": 0.0,
+                                    "total_size": 0, "max_size": 0}
+        entry["calls"] += 1
+        entry["total_s"] += elapsed
+        entry["max_s"] = max(entry["max_s"], elapsed)
+        if size is not None:
+            entry["total_size"] += size
+            entry["max_size"] = max(entry["max_size"], size)
+        _folded[path] += max(elapsed - children, 0.0)
+
+def instrument(name=None):
+    """
+    Decorator timing every call of a function when profiling is enabled.
+
+    Args:
+        name: Label in the report (defaults to the function's qualified name)
+    """
+    def decorate(func):
+        if not ENABLED:
+            return func
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack = _enter(label)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _exit(stack, time.perf_counter() - start, _input_size(args))
+        return wrapper
+    return decorate
+
+@contextlib.contextmanager
+def _timed_section(name, size):
+    stack = _enter(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _exit(stack, time.perf_counter() - start, size)
+
+def section(name, size=None):
+    """Context manager timing a block of code, e.g. the drawing inside update_plot"""
+    if not ENABLED:
+        return _null_section
+    return _timed_section(name, size)
+
+def summary():
+    """Per-name statistics collected so far"""
+    with _lock:
+        return {name: dict(entry, mean_s=entry["total_s"] / entry["calls"])
+                for name, entry in _stats.items()}
+
+def write_report(prefix=None):
+    """Write <prefix>.json and <prefix>.folded"""
+    if prefix is None:
+        prefix = "plantgrowth_profile" if _setting == "1" else os.path.splitext(_setting)[0]
+    with open(prefix + ".json", "w") as f:
+        json.dump(summary(), f, indent=2, sort_keys=True)
+    with _lock:
+        lines = [f"{path} {int(seconds * 1e6)}" for path, seconds in sorted(_folded.items())]
+    with open(prefix + ".folded", "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+if ENABLED:
+    atexit.register(write_report)
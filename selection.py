@@ -0,0 +1,151 @@
+"""
+Leave-one-out cross-validation of the estimation methods.
+
+For each method, loo_residuals() returns y_i minus the prediction at x_i
+of the model fitted without point i, for every i, without n separate
+refits:
+
+- Regressions use the hat-matrix diagonal: the leave-one-out residual is
+  e_i / (1 - h_ii). The exponential fit does this on the log scale.
+- Global polynomials (Lagrange, Newton) downdate the barycentric weights.
+  Dropping node i leaves the prediction
+  (sum_j w_j y_j - w_i y_i) / (sum_j w_j - w_i), which is O(1) per point.
+- Local polynomials evaluate, in one vectorized pass, the window each
+  left-out point would fall in once its node is removed.
+- Splines refit each left-out point on the SPLINE_WINDOW nodes to either
+  side of it, all solved together as one BatchCubicSpline in O(n) time and
+  memory. The influence of a node on a natural spline decays geometrically
+  (by at least half per node), so beyond a few dozen nodes the window is
+  indistinguishable from the full refit, and it is exact for short series.
+  This scores the natural spline of interpolation.py, which is therefore
+  what models.select_model fits when splines win (the "Splines" method
+  itself uses SciPy's not-a-knot spline).
+"""
+import numpy as np
+
+from interpolation import BatchCubicSpline, LagrangeInterpolator
+from profiling import instrument
+
+SPLINE_WINDOW = 32  # nodes on each side of a left-out point in the spline refits
+
+def _polynomial(x, y, environment):
+    w = LagrangeInterpolator(x, y).weights
+    with np.errstate(divide='ignore', invalid='ignore'):
+        prediction = (w @ y - w * y) / (w.sum() - w)
+    return y - prediction
+
+def _local_polynomial(x, y, environment, degree=3):
+    n = len(x)
+    k = min(degree, n - 2)
+    # Without node i, x_i falls in interval i-1 of the remaining n-1 nodes
+    start = np.clip(np.arange(n) - 1 - (k - 1) // 2, 0, n - k - 2)
+    window = start[:, None] + np.arange(k + 1)
+    window += window >= np.arange(n)[:, None]  # skip the left-out node
+    nodes, values = x[window], y[window]
+
+    # Lagrange basis of each window evaluated at its left-out point
+    ratio = (x[:, None, None] - nodes[:, None, :]) / (nodes[:, :, None] - nodes[:, None, :] + np.eye(k + 1))
+    ratio[:, np.arange(k + 1), np.arange(k + 1)] = 1.0
+    return y - (ratio.prod(axis=2) * values).sum(axis=1)
+
+def _spline(x, y, environment, window=SPLINE_WINDOW):
+    n = len(x)
+    k = min(2 * window, n - 1)
+    # Each left-out point keeps the k nearest nodes around it, shifted inwards at the ends
+    start = np.clip(np.arange(n) - window, 0, n - 1 - k)
+    nodes = start[:, None] + np.arange(k)
+    nodes += nodes >= np.arange(n)[:, None]  # skip the left-out node
+    spline = BatchCubicSpline(x[nodes], y[nodes])
+
+    # Evaluate each spline only at its own left-out point, which falls in
+    # segment i - start - 1 of its window
+    segment = np.clip(np.arange(n) - start - 1, 0, k - 2)[:, None]
+    a, b, c, d = (np.take_along_axis(coef, segment, axis=1)[:, 0]
+                  for coef in (spline.a, spline.b, spline.c, spline.d))
+    dx = x - np.take_along_axis(x[nodes], segment, axis=1)[:, 0]
+    return y - (((d * dx + c) * dx + b) * dx + a)
+
+def _hat_residuals(design, y):
+    """Leave-one-out residuals e_i / (1 - h_ii) of a least-squares fit"""
+    u, s, _ = np.linalg.svd(design, full_matrices=False)
+    rank = int((s > s[0] * max(design.shape) * np.finfo(float).eps).sum())
+    u = u[:, :rank]
+    leverage = (u * u).sum(axis=1)
+    residuals = y - u @ (u.T @ y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return residuals / (1.0 - leverage)
+
+def _linear(x, y, environment):
+    return _hat_residuals(np.column_stack([np.ones(len(x)), x]), y)
+
+def _exponential(x, y, environment):
+    positive = y > 0
+    if positive.sum() < 3:
+        # Leaving out one of two positive heights leaves nothing to fit a line to
+        return np.full(len(x), np.nan)
+    xp = x[positive]
+    log_y = np.log(y[positive])
+    design = np.column_stack([np.ones(len(xp)), xp])
+    prediction = np.empty(len(x))
+    # Leaving out a skipped height does not change the fit
+    beta = np.linalg.lstsq(design, log_y, rcond=None)[0]
+    prediction[~positive] = np.exp(beta[0] + beta[1] * x[~positive])
+    with np.errstate(over='ignore'):
+        prediction[positive] = np.exp(log_y - _hat_residuals(design, log_y))
+    return y - prediction
+
+def _environmental(x, y, environment):
+    if environment is None or len(environment) == 0:
+        return np.full(len(x), np.nan)
+    return _hat_residuals(np.column_stack([np.ones(len(x)), x, np.asarray(environment, dtype=float).T]), y)
+
+LOO_RESIDUALS = {
+    "Lagrange": _polynomial,
+    "Newton": _polynomial,
+    "Polinomio Local": _local_polynomial,
+    "Splines": _spline,
+    "Regresión Lineal": _linear,
+    "Regresión Exponencial": _exponential,
+    "Regresión Ambiental": _environmental,
+}
+
+@instrument()
+def loo_residuals(method, time_data, growth_data, environment=None):
+    """
+    Leave-one-out residuals of a method.
+
+    Args:
+        method: Name of a method in LOO_RESIDUALS
+        time_data: Array of measurement times (days)
+        growth_data: Array of measured heights (cm)
+        environment: Optional k x n array of sensor readings
+
+    Returns:
+        Array of y_i minus the estimate at x_i without point i, in input
+        order; NaN or inf where the estimate is undefined
+    """
+    x = np.asarray(time_data, dtype=float)
+    y = np.asarray(growth_data, dtype=float)
+    if len(x) < 3:
+        return np.full(len(x), np.nan)
+    order = np.argsort(x, kind='stable')
+    if environment is not None:
+        environment = np.asarray(environment, dtype=float)[:, order]
+    with np.errstate(all='ignore'):
+        residuals = LOO_RESIDUALS[method](x[order], y[order], environment)
+    result = np.empty(len(x))
+    result[order] = residuals
+    return result
+
+def loo_scores(time_data, growth_data, environment=None, methods=LOO_RESIDUALS):
+    """
+    Leave-one-out root mean squared error of each method.
+
+    Returns:
+        Dict of method name to RMSE in cm (NaN when a method cannot be scored)
+    """
+    scores = {}
+    for method in methods:
+        residuals = loo_residuals(method, time_data, growth_data, environment)
+        scores[method] = float(np.sqrt(np.mean(residuals ** 2))) if np.isfinite(residuals).all() else np.nan
+    return scores
@@ -0,0 +1,274 @@
+"""
+Local HTTP/JSON prediction service.
+
+Lets other greenhouse tools query growth estimates without the Tk
+interface. Fitted models stay warm in a FitCache shared by all clients,
+concurrent requests that need the same fit wait on a single in-flight fit,
+and fits run on an executor so the event loop keeps serving other
+connections meanwhile. Only the standard library and the project modules
+are used; connections are HTTP/1.1 with keep-alive.
+
+Endpoints:
+    GET  /health      {"status": "ok"}
+    GET  /methods     list of method names
+    GET  /datasets    names with their number of points and sensor columns
+    GET  /stats       cache hits, misses and size, and fits in flight
+    POST /datasets    {"name": ..., "data": [[t, ...], [h, ...]]} registers a dataset
+    POST /predict     {"dataset": ..., "method": ..., "days": [...]}
+
+/predict also accepts "data" instead of "dataset" for an unregistered
+series, and a JSON list of queries answered in one response.
+
+Example:
+    python service.py --port 8765 --warm
+    curl -d '{"dataset": "Basil", "method": "Newton", "days": [2.5, 10]}' localhost:8765/predict
+"""
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from datasets import DEFAULT_DATA, ENVIRONMENT_DATASETS, load_environment
+from models import METHODS, FitCache, SelectedModel
+
+MAX_BODY = 10 * 1024 * 1024
+# Query arrays up to this size are evaluated on the event loop; larger ones
+# go to the executor like the fits
+INLINE_EVAL_POINTS = 4096
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _as_dataset(data):
+    try:
+        data = np.asarray(data, dtype=float)
+    except (TypeError, ValueError):
+        raise HTTPError(400, "data must be a rectangular list of numbers")
+    if data.ndim != 2 or len(data) < 2 or data.shape[1] < 2:
+        raise HTTPError(400, "data must be [[t, ...], [h, ...], ...] with at least 2 points")
+    if not np.isfinite(data).all():
+        raise HTTPError(400, "data must not contain NaN or infinite values")
+    if len(np.unique(data[0])) != data.shape[1]:
+        raise HTTPError(400, "data must not repeat a time")
+    return data
+
+def _json_heights(values):
+    # JSON has no NaN: undefined estimates become null
+    values = np.atleast_1d(np.asarray(values, dtype=float))
+    if np.isfinite(values).all():
+        return values.tolist()
+    return [v if np.isfinite(v) else None for v in values.tolist()]
+
+class PredictionService:
+    """
+    Model store behind the HTTP handlers.
+
+    Args:
+        datasets: Mapping of dataset name to a 2 x n array of (time, height)
+            rows, optionally followed by sensor reading rows
+        cache_size: Maximum number of fitted models kept warm
+        executor: concurrent.futures executor for fits (a thread pool by default)
+    """
+
+    def __init__(self, datasets, cache_size=64, executor=None):
+        self.datasets = {name: _as_dataset(data) for name, data in datasets.items()}
+        self.cache = FitCache(maxsize=cache_size)
+        self.executor = executor or ThreadPoolExecutor()
+        self._inflight = {}  # (data key, method) -> future of the running fit
+
+    async def model(self, method, data):
+        """Return a fitted model, sharing one fit between concurrent callers"""
+        model = self.cache.peek(method, data, count_hit=True)
+        if model is not None:
+            return model
+
+        key = (FitCache.data_key(data), method)
+        future = self._inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, self.cache.get, method, data)
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await future
+
+    async def warm(self, methods=METHODS):
+        """Fit every dataset with every method so the first queries are hits"""
+        jobs = [self.model(method, data) for data in self.datasets.values() for method in methods]
+        await asyncio.gather(*jobs, return_exceptions=True)
+
+    async def predict(self, query):
+        if not isinstance(query, dict):
+            raise HTTPError(400, "each query must be a JSON object")
+        method = query.get("method")
+        if method not in METHODS:
+            raise HTTPError(400, f"method must be one of {METHODS}")
+        if "data" in query:
+            name, data = None, _as_dataset(query["data"])
+        else:
+            name = query.get("dataset")
+            if name not in self.datasets:
+                raise HTTPError(404, f"unknown dataset: {name}")
+            data = self.datasets[name]
+        try:
+            days = np.asarray(query.get("days", []), dtype=float).ravel()
+        except (TypeError, ValueError):
+            raise HTTPError(400, "days must be a list of numbers")
+
+        try:
+            model = await self.model(method, data)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+
+        with np.errstate(all='ignore'):
+            if len(days) <= INLINE_EVAL_POINTS:
+                heights = model(days)
+            else:
+                loop = asyncio.get_running_loop()
+                heights = await loop.run_in_executor(self.executor, model, days)
+        response = {"dataset": name, "method": method, "days": days.tolist(),
+                    "heights": _json_heights(heights)}
+        if isinstance(model, SelectedModel):
+            response["selected_method"] = model.method
+            response["loo_rmse"] = model.loo_rmse
+        return response
+
+    def dataset_info(self):
+        return [{"name": name, "points": int(data.shape[1]), "sensor_rows": int(len(data) - 2)}
+                for name, data in self.datasets.items()]
+
+    async def handle(self, verb, path, body):
+        """Dispatch one request and return (status, JSON-serializable payload)"""
+        routes = {
+            ("GET", "/health"): lambda: (200, {"status": "ok"}),
+            ("GET", "/methods"): lambda: (200, METHODS),
+            ("GET", "/datasets"): lambda: (200, self.dataset_info()),
+            ("GET", "/stats"): lambda: (200, {**self.cache.cache_info()._asdict(),
+                                              "inflight": len(self._inflight)}),
+        }
+        if (verb, path) in routes:
+            return routes[verb, path]()
+        if verb != "POST" or path not in ("/predict", "/datasets"):
+            known = path in ("/predict", "/datasets") or any(p == path for _, p in routes)
+            raise HTTPError(405 if known else 404, f"{verb} {path} not supported")
+
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError as e:
+            raise HTTPError(400, f"invalid JSON: {e}")
+
+        if path == "/datasets":
+            if not isinstance(payload, dict) or not isinstance(payload.get("name"), str):
+                raise HTTPError(400, 'expected {"name": ..., "data": ...}')
+            self.datasets[payload["name"]] = _as_dataset(payload.get("data"))
+            return 201, {"name": payload["name"]}
+
+        if isinstance(payload, list):
+            # One bad query of a batch reports its own error instead of failing the rest
+            results = await asyncio.gather(*(self.predict(q) for q in payload), return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception) and not isinstance(result, HTTPError):
+                    raise result
+            return 200, [{"error": str(r)} if isinstance(r, HTTPError) else r for r in results]
+        return 200, await self.predict(payload)
+
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    verb, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get("connection", "").lower()
+                if version == "HTTP/1.1":
+                    keep_alive = connection != "close"
+                else:
+                    keep_alive = connection == "keep-alive"
+                try:
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_BODY:
+                        keep_alive = False
+                        raise HTTPError(413, f"body larger than {MAX_BODY} bytes")
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self.handle(verb, target.split("?")[0], body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+
+                content = json.dumps(payload).encode()
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                             f"Content-Type: application/json\r\n"
+                             f"Content-Length: {len(content)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+                             + content)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(service, host="127.0.0.1", port=8765, warm=False):
+    if warm:
+        await service.warm()
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    print(f"Servicio de predicción en http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio local de predicción de crecimiento (HTTP/JSON)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--csv", nargs="*", default=list(ENVIRONMENT_DATASETS.values()),
+                        help="registros de sensores con el formato de Basil_02Jan-3Feb.csv")
+    parser.add_argument("--cache-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="hilos para los ajustes")
+    parser.add_argument("--warm", action="store_true",
+                        help="ajustar todos los métodos al arrancar")
+    args = parser.parse_args(argv)
+
+    datasets = dict(DEFAULT_DATA)
+    for name, path in ENVIRONMENT_DATASETS.items():
+        if path in args.csv:
+            datasets[name] = load_environment(path)
+    for path in args.csv:
+        if path not in ENVIRONMENT_DATASETS.values():
+            datasets[os.path.splitext(os.path.basename(path))[0]] = load_environment(path)
+
+    for name, data in list(datasets.items()):
+        try:
+            _as_dataset(data)
+        except HTTPError as e:
+            print(f"Se omite {name}: {e}")
+            del datasets[name]
+
+    service = PredictionService(datasets, args.cache_size, ThreadPoolExecutor(args.workers))
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.warm))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Cold-start timing for main.py.
+
+main.py imports this module first and calls mark() after each startup
+phase. Set PLANTGROWTH_STARTUP_REPORT=1 to print the breakdown once the
+window is ready, or set it to a file path ending in .json to append the
+timings there so cold-start regressions can be tracked over time.
+"""
+import json
+import os
+import time
+
+_start = time.perf_counter()
+_last = _start
+_phases = []
+
+def mark(phase):
+    """Record the time spent since the previous mark under phase"""
+    global _last
+    now = time.perf_counter()
+    _phases.append((phase, now - _last))
+    _last = now
+
+def report():
+    """Print or save the breakdown if PLANTGROWTH_STARTUP_REPORT is set"""
+    target = os.environ.get("PLANTGROWTH_STARTUP_REPORT")
+    if not target:
+        return
+
+    total = _last - _start
+    if target.endswith(".json"):
+        with open(target, "a") as f:
+            f.write(json.dumps({"timestamp": time.time(), "total_s": total,
+                                "phases": dict(_phases)}) + "\n")
+        return
+
+    print("Tiempo de arranque:")
+    for phase, seconds in _phases:
+        print(f"  {phase:<24} {seconds * 1000:8.1f} ms")
+    print(f"  {'total':<24} {total * 1000:8.1f} ms")
@@ -0,0 +1,288 @@
+"""
+Multi-plant store of growth measurements.
+
+Sensor logs are ingested once into a folder holding, per plant, two raw
+column files: int32 day offsets from a fixed epoch and float32 heights,
+both kept sorted by day. index.json maps plant names to their files, row
+counts and ingested sources. Queries memory-map the columns and locate
+date ranges by binary search, so they never re-read the CSVs and the store
+can be larger than RAM.
+
+Example:
+    python store.py --root plantas ingest Basil_02Jan-3Feb.csv --plant Basil
+    python store.py --root plantas query Basil --start 5/1/2025 --stop 20/1/2025
+    python store.py --root plantas day 10/1/2025
+"""
+import argparse
+import datetime
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from datasets import DATE_FORMAT, iter_dataB
+from profiling import instrument
+
+STORE_VERSION = 1
+EPOCH = datetime.date(2000, 1, 1)  # day offset 0 of every plant
+
+def day_offset(date):
+    """
+    Convert a date to a day offset from EPOCH.
+
+    Args:
+        date: datetime.date, a DD/MM/YYYY string, or an offset (returned as is)
+
+    Returns:
+        Integer day offset
+    """
+    if isinstance(date, str):
+        date = datetime.datetime.strptime(date, DATE_FORMAT).date()
+    if isinstance(date, datetime.datetime):
+        date = date.date()
+    if isinstance(date, datetime.date):
+        return (date - EPOCH).days
+    return int(date)
+
+def offset_date(offset):
+    """Inverse of day_offset"""
+    return EPOCH + datetime.timedelta(days=int(offset))
+
+class PlantStore:
+    """
+    Sorted, memory-mapped (day, height) columns for many plants.
+
+    In-order data, the usual case for daily logs, is appended to the column
+    files in O(new rows). Rows older than the newest stored day are sorted
+    and merged with the stored columns into new files, which touches the
+    whole plant once per ingest.
+
+    Args:
+        root: Folder of the store, created if missing
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._index_path = os.path.join(root, 'index.json')
+        try:
+            with open(self._index_path) as f:
+                self.index = json.load(f)
+        except FileNotFoundError:
+            self.index = {'version': STORE_VERSION, 'epoch': EPOCH.isoformat(), 'plants': {}}
+        if self.index.get('version') != STORE_VERSION or self.index.get('epoch') != EPOCH.isoformat():
+            raise ValueError(f"Incompatible store in {root}")
+        self._columns = {}  # plant -> (days, heights) memmaps
+
+    @property
+    def plants(self):
+        return list(self.index['plants'])
+
+    def __contains__(self, plant):
+        return plant in self.index['plants']
+
+    def __len__(self):
+        return len(self.index['plants'])
+
+    def _paths(self, plant):
+        name = self.index['plants'][plant]['file']
+        return os.path.join(self.root, f"{name}.days"), os.path.join(self.root, f"{name}.height")
+
+    def _save_index(self):
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(tmp, self._index_path)
+
+    def columns(self, plant):
+        """
+        Memory-mapped (days, heights) columns of a plant, sorted by day.
+
+        Returns:
+            Tuple of an int32 array of day offsets and a float32 array of heights
+        """
+        if plant not in self._columns:
+            rows = self.index['plants'][plant]['rows']
+            if rows == 0:
+                return np.empty(0, np.int32), np.empty(0, np.float32)
+            days_path, height_path = self._paths(plant)
+            self._columns[plant] = (np.memmap(days_path, np.int32, 'r', shape=(rows,)),
+                                    np.memmap(height_path, np.float32, 'r', shape=(rows,)))
+        return self._columns[plant]
+
+    @instrument()
+    def ingest(self, csv_path, plant=None, chunksize=100_000):
+        """
+        Add the measurements of a sensor log to a plant.
+
+        A file already ingested with the same size and modification time is
+        skipped, so re-running an import is harmless.
+
+        Args:
+            csv_path: Path to a CSV with the Basil_02Jan-3Feb.csv schema
+            plant: Plant name (defaults to the file name without extension)
+            chunksize: Number of rows parsed per chunk
+
+        Returns:
+            Number of rows added
+        """
+        if plant is None:
+            plant = os.path.splitext(os.path.basename(csv_path))[0]
+        stat = os.stat(csv_path)
+        source = {'path': os.path.abspath(csv_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+        plants = self.index['plants']
+        if plant not in plants:
+            plants[plant] = {'file': f"p{len(plants):05d}", 'rows': 0, 'sources': []}
+        entry = plants[plant]
+        if source in entry['sources']:
+            return 0
+
+        self._columns.pop(plant, None)
+        days_path, height_path = self._paths(plant)
+        rows = entry['rows']
+        last = self.columns(plant)[0][-1] if rows else np.iinfo(np.int32).min
+        self._columns.pop(plant, None)
+        sorted_rows = None  # rows before the first out-of-order chunk
+
+        with open(days_path, 'ab') as days_file, open(height_path, 'ab') as height_file:
+            # Drop bytes left behind by an interrupted ingest
+            days_file.truncate(rows * 4)
+            height_file.truncate(rows * 4)
+            for chunk in iter_dataB(csv_path, chunksize=chunksize, origin=EPOCH):
+                days = chunk[0].astype(np.int32)
+                if sorted_rows is None and (days[0] < last or np.any(np.diff(days) < 0)):
+                    sorted_rows = rows
+                days.tofile(days_file)
+                chunk[1].astype(np.float32).tofile(height_file)
+                rows += len(days)
+                last = max(last, days[-1])
+
+        added = rows - entry['rows']
+        entry['rows'] = rows
+        if sorted_rows is not None:
+            self._merge_tail(plant, sorted_rows)
+        entry['sources'].append(source)
+        self._save_index()
+        return added
+
+    def _merge_tail(self, plant, head_rows):
+        """Sort the rows after head_rows and merge them into the sorted head"""
+        rows = self.index['plants'][plant]['rows']
+        days_path, height_path = self._paths(plant)
+        head_days = np.memmap(days_path, np.int32, 'r', shape=(rows,))
+        heights = np.memmap(height_path, np.float32, 'r', shape=(rows,))
+
+        # Only the tail is sorted in memory; the head is copied segment by segment
+        order = np.argsort(head_days[head_rows:], kind='stable')
+        tail_days = np.array(head_days[head_rows:][order])
+        tail_heights = np.array(heights[head_rows:][order])
+        insert = np.searchsorted(head_days[:head_rows], tail_days, side='right')
+        tail_at = insert + np.arange(len(tail_days))
+
+        merged = []
+        for path, dtype, head, tail in ((days_path, np.int32, head_days, tail_days),
+                                        (height_path, np.float32, heights, tail_heights)):
+            tmp = path + '.merge'
+            out = np.memmap(tmp, dtype, 'w+', shape=(rows,))
+            out[tail_at] = tail
+            bounds = np.concatenate([[0], insert, [head_rows]])
+            for j in np.flatnonzero(np.diff(bounds)):
+                # Head rows between two insertion points shift by j tail rows
+                out[bounds[j] + j:bounds[j + 1] + j] = head[bounds[j]:bounds[j + 1]]
+            out.flush()
+            del out
+            merged.append((tmp, path))
+        del head_days, heights
+        for tmp, path in merged:
+            os.replace(tmp, path)
+
+    def query(self, plant, start=None, stop=None):
+        """
+        Measurements of a plant between two days, both included.
+
+        Args:
+            plant: Plant name
+            start: First day (see day_offset), None for the beginning
+            stop: Last day (see day_offset), None for the end
+
+        Returns:
+            Tuple of (day offsets, heights) views of the memory-mapped columns
+        """
+        days, heights = self.columns(plant)
+        lo = 0 if start is None else np.searchsorted(days, day_offset(start), side='left')
+        hi = len(days) if stop is None else np.searchsorted(days, day_offset(stop), side='right')
+        return days[lo:hi], heights[lo:hi]
+
+    def on_day(self, day):
+        """
+        Heights of every plant measured on a given day.
+
+        Args:
+            day: Day (see day_offset)
+
+        Returns:
+            Dict of plant name to the array of heights measured that day
+        """
+        day = day_offset(day)
+        result = {}
+        for plant in self.plants:
+            days, heights = self.columns(plant)
+            if not len(days) or day < days[0] or day > days[-1]:
+                continue
+            lo = np.searchsorted(days, day, side='left')
+            hi = np.searchsorted(days, day, side='right')
+            if hi > lo:
+                result[plant] = heights[lo:hi]
+        return result
+
+    def dataset(self, plant, start=None, stop=None):
+        """
+        Window of a plant as a 2 x n float array for fit_model and the GUI.
+
+        Days are counted from the first measurement in the window, like
+        datasets.load_dataB.
+        """
+        days, heights = self.query(plant, start, stop)
+        days = days.astype(float)
+        return np.array([days - days[0] if len(days) else days, heights.astype(float)])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Almacén de mediciones de varias plantas")
+    parser.add_argument("--root", default="plantas", help="carpeta del almacén")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="importar registros CSV")
+    ingest.add_argument("csv", nargs="+")
+    ingest.add_argument("--plant", help="nombre de la planta (por defecto, el nombre del archivo)")
+
+    query = commands.add_parser("query", help="mediciones de una planta entre dos fechas")
+    query.add_argument("plant")
+    query.add_argument("--start", help="fecha inicial DD/MM/AAAA")
+    query.add_argument("--stop", help="fecha final DD/MM/AAAA")
+
+    day = commands.add_parser("day", help="mediciones de todas las plantas en una fecha")
+    day.add_argument("date", help="fecha DD/MM/AAAA")
+
+    commands.add_parser("list", help="plantas almacenadas")
+    args = parser.parse_args(argv)
+
+    store = PlantStore(args.root)
+    if args.command == "ingest":
+        for path in args.csv:
+            print(f"{path}: {store.ingest(path, args.plant)} filas")
+    elif args.command == "query":
+        for d, h in zip(*store.query(args.plant, args.start, args.stop)):
+            print(f"{offset_date(d).strftime(DATE_FORMAT)}  {h:.2f}")
+    elif args.command == "day":
+        for plant, heights in store.on_day(args.date).items():
+            print(f"{plant}: {', '.join(f'{h:.2f}' for h in heights)}")
+    else:
+        for plant in store.plants:
+            days, _ = store.columns(plant)
+            span = f"{offset_date(days[0]).strftime(DATE_FORMAT)} - {offset_date(days[-1]).strftime(DATE_FORMAT)}" if len(days) else "vacía"
+            print(f"{plant}: {len(days)} filas, {span}")
+
+if __name__ == "__main__":
+    main()
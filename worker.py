@@ -0,0 +1,113 @@
+"""
+Background execution of fits for the Tk interface.
+
+Tk is single threaded, so FitWorker runs jobs on one daemon thread and
+hands the results back through a queue that the Tk event loop polls with
+root.after; callbacks therefore always run on the Tk thread.
+"""
+import itertools
+import queue
+import threading
+
+class FitWorker:
+    """
+    Single background thread with per-channel supersession and debouncing.
+
+    Every submit() on a channel supersedes the previous request on that
+    channel: if it has not started yet it is skipped, and if it is already
+    running its result is discarded when it arrives. Python threads cannot be
+    interrupted, so a superseded fit that is already running still finishes
+    in the background.
+
+    Args:
+        root: Tk root used to schedule polling
+        on_busy: Optional callable receiving True when work starts and False
+            when the worker becomes idle, e.g. to drive a progress bar
+        poll_ms: Interval between checks for finished jobs
+    """
+
+    def __init__(self, root, on_busy=None, poll_ms=30):
+        self.root = root
+        self.on_busy = on_busy
+        self.poll_ms = poll_ms
+
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._counter = itertools.count(1)
+        self._latest = {}    # channel -> generation of the newest request
+        self._debounce = {}  # channel -> pending root.after id
+        self._outstanding = 0
+        self._busy = False
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, job, callback, channel="default", delay_ms=0):
+        """
+        Run job() in the background and then callback(result, error) on the Tk thread.
+
+        Args:
+            job: Callable without arguments, run on the worker thread
+            callback: Called with (result, None) on success or (None, exception)
+            channel: Requests on the same channel supersede each other
+            delay_ms: Debounce delay; another submit on the channel within this
+                time replaces the request before any work is done
+        """
+        generation = next(self._counter)
+        self._latest[channel] = generation
+        self._cancel_debounce(channel)
+
+        if delay_ms:
+            self._debounce[channel] = self.root.after(
+                delay_ms, lambda: self._enqueue(channel, generation, job, callback))
+        else:
+            self._enqueue(channel, generation, job, callback)
+
+    def cancel(self, channel="default"):
+        """Drop any pending or running request on channel"""
+        self._latest[channel] = next(self._counter)
+        self._cancel_debounce(channel)
+
+    def _cancel_debounce(self, channel):
+        after_id = self._debounce.pop(channel, None)
+        if after_id is not None:
+            self.root.after_cancel(after_id)
+
+    def _enqueue(self, channel, generation, job, callback):
+        self._debounce.pop(channel, None)
+        self._requests.put((channel, generation, job, callback))
+        self._outstanding += 1
+        if not self._busy:
+            self._set_busy(True)
+            self.root.after(self.poll_ms, self._poll)
+
+    def _run(self):
+        while True:
+            channel, generation, job, callback = self._requests.get()
+            result = error = None
+            if self._latest.get(channel) == generation:
+                try:
+                    result = job()
+                except Exception as e:
+                    error = e
+            self._results.put((channel, generation, callback, result, error))
+
+    def _poll(self):
+        while True:
+            try:
+                channel, generation, callback, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding -= 1
+            if self._latest.get(channel) == generation:
+                callback(result, error)
+
+        if self._outstanding:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._set_busy(False)
+
+    def _set_busy(self, busy):
+        self._busy = busy
+        if self.on_busy is not None:
+            self.on_busy(busy)